@@ -0,0 +1,151 @@
+""" Runs the benchmark suite and checks results against a saved baseline.
+
+    Usage (from the repository root):
+        python -m benchmarks.run [--quick] [--only NAME ...] [--repeat N]
+                                 [--save PATH] [--baseline PATH] [--threshold FRACTION]
+
+    For every workload in benchmarks.workloads.BENCHMARKS it reports operations per second,
+    latency percentiles and peak memory allocated by Python during a run. Latencies are
+    those of individual operations for workloads providing run.sample, and of whole runs
+    otherwise. Percentiles that need more samples than were collected are left empty.
+    Exits with status 1 if a result regressed past the threshold.
+"""
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+
+from benchmarks.workloads import BENCHMARKS
+
+
+# Fewest samples for which a percentile differs from the maximum
+MIN_SAMPLES = {0.5: 1, 0.9: 10, 0.99: 100}
+
+
+def percentile(sorted_values : list, fraction : float) -> float:
+    """ Nearest-rank percentile of an already sorted list.
+    """
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def measure(factory, params : dict, repeat : int) -> dict:
+    """ Runs a workload once to warm up, repeat times to measure its throughput, once
+        through run.sample (if provided) to collect operation latencies and once more
+        under tracemalloc to find its peak memory.
+
+    Arguments:
+        factory {function} -- Workload factory from benchmarks.workloads
+        params {dict} -- Parameters passed to the factory
+        repeat {int} -- Number of timed runs
+
+    Returns:
+        dict -- Parameters and measurements of the workload
+    """
+    operations, run = factory(**params)
+    try:
+        run()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        # Timing each operation slows the run down, so it is kept apart from the throughput runs
+        if hasattr(run, "sample"):
+            latencies = []
+            run.sample(latencies)
+        else:
+            latencies = list(timings)
+
+        tracemalloc.start()
+        run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        if hasattr(run, "cleanup"):
+            run.cleanup()
+
+    timings.sort()
+    latencies.sort()
+    result = {
+        "params": params,
+        "operations": operations,
+        "ops_per_sec": operations / percentile(timings, 0.5),
+        "latency_samples": len(latencies),
+        "peak_memory": peak_memory,
+    }
+    for fraction, name in [(0.5, "latency_p50"), (0.9, "latency_p90"), (0.99, "latency_p99")]:
+        result[name] = percentile(latencies, fraction) if len(latencies) >= MIN_SAMPLES[fraction] else None
+    return result
+
+
+def compare(results : dict, baseline : dict, threshold : float) -> list:
+    """ Lists every result that is slower or uses more memory than the baseline by more than threshold.
+        Results measured with different parameters than the baseline are not compared.
+
+    Arguments:
+        results {dict} -- Measurements by benchmark name
+        baseline {dict} -- Previously saved measurements by benchmark name
+        threshold {float} -- Accepted relative difference (0.2 = 20%)
+
+    Returns:
+        list -- Description of each regression. Empty if there is none.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None or previous["params"] != result["params"]:
+            continue
+
+        if result["ops_per_sec"] < previous["ops_per_sec"] * (1 - threshold):
+            regressions.append("{}: {:.0f} ops/s, baseline {:.0f} ops/s".format(
+                name, result["ops_per_sec"], previous["ops_per_sec"]))
+        if result["peak_memory"] > previous["peak_memory"] * (1 + threshold):
+            regressions.append("{}: {} bytes peak memory, baseline {} bytes".format(
+                name, result["peak_memory"], previous["peak_memory"]))
+    return regressions
+
+
+def main(argv : list = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument("--quick", action="store_true", help="use small workloads")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs (default: 5)")
+    parser.add_argument("--save", help="save results as a JSON baseline")
+    parser.add_argument("--baseline", help="JSON baseline to compare results against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="accepted regression (default: 0.2)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    print("{:<24} {:>12} {:>8} {:>12} {:>12} {:>12} {:>12}".format(
+        "benchmark", "ops/s", "samples", "p50 (us)", "p90 (us)", "p99 (us)", "peak (B)"))
+    for name in args.only or BENCHMARKS:
+        factory, params, quick_params = BENCHMARKS[name]
+        result = measure(factory, quick_params if args.quick else params, args.repeat)
+        results[name] = result
+        latencies = ["-" if result[key] is None else "{:.1f}".format(result[key] * 1e6)
+                     for key in ["latency_p50", "latency_p90", "latency_p99"]]
+        print("{:<24} {:>12.0f} {:>8} {:>12} {:>12} {:>12} {:>12}".format(
+            name, result["ops_per_sec"], result["latency_samples"], *latencies, result["peak_memory"]))
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
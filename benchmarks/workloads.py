@@ -0,0 +1,212 @@
+""" Parameterized workload generators for every problem module.
+
+    Each workload factory receives its parameters as keyword arguments and returns
+    a tuple (operations, run), where run() executes the whole workload once and
+    operations is the number of operations it performs. Generated inputs use a
+    fixed seed so results can be compared between runs.
+
+    Workloads made of independent operations also provide run.sample(latencies),
+    which executes the same workload while appending the time taken by each
+    operation to latencies.
+"""
+import os
+import random
+import shutil
+import tempfile
+import time
+
+from problem_1 import LRU_Cache
+from problem_2 import find_files
+from problem_3 import huffman_encoding, huffman_decoding
+from problem_4 import Group, MembershipCache, is_user_in_group
+from problem_5 import Blockchain
+from problem_6 import LinkedList, union, intersection
+
+SEED = 42
+
+
+def _zipf_keys(count : int, universe : int, skew : float, rng : random.Random) -> list:
+    # Smaller keys are much more frequent, like real cache and word traces
+    weights = [1 / (rank ** skew) for rank in range(1, universe + 1)]
+    return rng.choices(range(universe), weights=weights, k=count)
+
+
+def lru_trace(operations : int, capacity : int, universe : int, skew : float = 1.0):
+    """ Replays a get/set trace on LRU_Cache. Each missed get is followed by a set.
+    """
+    rng = random.Random(SEED)
+    keys = _zipf_keys(operations, universe, skew, rng)
+
+    def run():
+        cache = LRU_Cache(capacity)
+        for key in keys:
+            if cache.get(key) == -1:
+                cache.set(key, key)
+
+    def sample(latencies : list):
+        cache = LRU_Cache(capacity)
+        for key in keys:
+            start = time.perf_counter()
+            if cache.get(key) == -1:
+                cache.set(key, key)
+            latencies.append(time.perf_counter() - start)
+
+    run.sample = sample
+    return operations, run
+
+
+def directory_tree(depth : int, fanout : int, files_per_dir : int):
+    """ Finds .c files in a synthetic directory tree. Each directory contains fanout
+        subdirectories and files_per_dir files, alternating between .c and .h.
+        Operations are the number of directories listed.
+    """
+    root = tempfile.mkdtemp(prefix="find_files_")
+    directories = [root]
+    level = [root]
+    for _ in range(depth):
+        next_level = []
+        for directory in level:
+            for index in range(fanout):
+                path = os.path.join(directory, "dir{}".format(index))
+                os.mkdir(path)
+                next_level.append(path)
+        directories += next_level
+        level = next_level
+
+    for directory in directories:
+        for index in range(files_per_dir):
+            suffix = ".c" if index % 2 == 0 else ".h"
+            open(os.path.join(directory, "file{}{}".format(index, suffix)), "w").close()
+
+    def run():
+        find_files(".c", root)
+
+    run.cleanup = lambda: shutil.rmtree(root, ignore_errors=True)
+    return len(directories), run
+
+
+def text_corpus(words : int, vocabulary : int, skew : float = 1.0):
+    """ Encodes and decodes a text made of random words drawn with a Zipf distribution.
+        Operations are the number of characters in the text.
+    """
+    rng = random.Random(SEED)
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocabulary_words = ["".join(rng.choice(letters) for _ in range(rng.randint(2, 10))) for _ in range(vocabulary)]
+    text = " ".join(vocabulary_words[index] for index in _zipf_keys(words, vocabulary, skew, rng))
+
+    def run():
+        encoded_data, tree = huffman_encoding(text)
+        assert(huffman_decoding(encoded_data, tree) == text)
+
+    return len(text), run
+
+
+def _group_hierarchy(depth : int, fanout : int, users_per_group : int) -> tuple:
+    root = Group("root")
+    groups = [root]
+    level = [root]
+    for depth_index in range(depth):
+        next_level = []
+        for parent in level:
+            for index in range(fanout):
+                child = Group("{}_{}_{}".format(parent.get_name(), depth_index, index))
+                parent.add_group(child)
+                next_level.append(child)
+        groups += next_level
+        level = next_level
+
+    users = []
+    for group in groups:
+        for index in range(users_per_group):
+            user = "{}_user{}".format(group.get_name(), index)
+            group.add_user(user)
+            users.append(user)
+    return root, users
+
+
+def group_hierarchy(queries : int, depth : int, fanout : int, users_per_group : int, cached : bool = False):
+    """ Queries membership of random users (and some unknown users) against the root group.
+        The MembershipCache is kept between runs, so cached runs measure a warm cache.
+    """
+    rng = random.Random(SEED)
+    root, users = _group_hierarchy(depth, fanout, users_per_group)
+    query_users = [rng.choice(users) if rng.random() < 0.9 else "orphan" for _ in range(queries)]
+    lookup = MembershipCache(queries * (depth + 1) * fanout).is_user_in_group if cached else is_user_in_group
+
+    def run():
+        for user in query_users:
+            lookup(user, root)
+
+    def sample(latencies : list):
+        for user in query_users:
+            start = time.perf_counter()
+            lookup(user, root)
+            latencies.append(time.perf_counter() - start)
+
+    run.sample = sample
+    return queries, run
+
+
+def chain(blocks : int, data_size : int):
+    """ Appends blocks to a Blockchain and verifies it. Latencies are those of append().
+    """
+    data = "x" * data_size
+
+    def run():
+        blockchain = Blockchain()
+        for _ in range(blocks):
+            blockchain.append(data)
+        assert(blockchain.verify())
+
+    def sample(latencies : list):
+        blockchain = Blockchain()
+        for _ in range(blocks):
+            start = time.perf_counter()
+            blockchain.append(data)
+            latencies.append(time.perf_counter() - start)
+        assert(blockchain.verify())
+
+    run.sample = sample
+    return blocks, run
+
+
+def list_pair(size : int, overlap : float):
+    """ Computes union and intersection of two LinkedLists sharing a fraction of their values.
+    """
+    rng = random.Random(SEED)
+    shared = int(size * overlap)
+    values_1 = rng.sample(range(size * 4), size)
+    values_2 = values_1[:shared] + rng.sample(range(size * 4, size * 8), size - shared)
+    rng.shuffle(values_2)
+
+    llist_1 = LinkedList()
+    llist_2 = LinkedList()
+    for value in values_1:
+        llist_1.append(value)
+    for value in values_2:
+        llist_2.append(value)
+
+    def run():
+        union(llist_1, llist_2)
+        intersection(llist_1, llist_2)
+
+    return size * 2, run
+
+
+# name -> (workload factory, full parameters, quick parameters)
+BENCHMARKS = {
+    "lru_cache": (lru_trace, dict(operations=200000, capacity=1000, universe=20000),
+                             dict(operations=20000, capacity=100, universe=2000)),
+    "find_files": (directory_tree, dict(depth=4, fanout=5, files_per_dir=10),
+                                   dict(depth=3, fanout=3, files_per_dir=4)),
+    "huffman": (text_corpus, dict(words=20000, vocabulary=5000),
+                             dict(words=2000, vocabulary=500)),
+    "is_user_in_group": (group_hierarchy, dict(queries=2000, depth=4, fanout=4, users_per_group=5),
+                                          dict(queries=200, depth=3, fanout=3, users_per_group=3)),
+    "is_user_in_group_cached": (group_hierarchy, dict(queries=2000, depth=4, fanout=4, users_per_group=5, cached=True),
+                                                 dict(queries=200, depth=3, fanout=3, users_per_group=3, cached=True)),
+    "blockchain": (chain, dict(blocks=50000, data_size=64),
+                          dict(blocks=5000, data_size=64)),
+    "union_intersection": (list_pair, dict(size=200000, overlap=0.5),
+                                      dict(size=20000, overlap=0.5)),
+}
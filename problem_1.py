@@ -1,5 +1,7 @@
 import warnings
 
+import tracing
+
 class Node:
     def __init__(self, key=None, value=None):
         self._key = key
@@ -93,6 +95,8 @@ class LRU_Cache(object):
             Node.value -- Value stored in cache. Return -1 if nonexistent.
         """
         if key in self._cache_dict.keys():
+            if tracing.enabled:
+                tracing.count("lru_cache.hit")
             retrieved_node = self._cache_dict[key]
 
             # Move used node to head of DoublyLinkedList
@@ -101,6 +105,8 @@ class LRU_Cache(object):
 
             return retrieved_node.value
         else:
+            if tracing.enabled:
+                tracing.count("lru_cache.miss")
             return -1
 
     def set(self, key, value):
@@ -112,6 +118,9 @@ class LRU_Cache(object):
             key {[type]} -- Key used to store value stored in cache
             value {[type]} -- Value to be stored in cache
         """
+        if tracing.enabled:
+            tracing.count("lru_cache.set")
+
         # Check if capacity is above zero
         if self._capacity > 0:
             # Set the value if the key is not present in the cache. If the cache is at capacity remove the oldest item. 
@@ -120,6 +129,8 @@ class LRU_Cache(object):
                 self._lru_list.prepend(self._cache_dict[key])
             else:
                 oldest_node = self._lru_list.tail # Least used item is always at the end of the DoublyLinkedList
+                if tracing.enabled:
+                    tracing.count("lru_cache.evict")
 
                 # Removes node from both dictionary and DoublyLinkedList
                 old_key = oldest_node.key
@@ -1,6 +1,17 @@
+import ctypes
+import ctypes.util
+import errno
 import os
+import select
+import shutil
+import struct
+import sys
+import tempfile
+import time
 from typing import List
 
+import tracing
+
 def find_files(suffix, path):
     """
     Find all files beneath path with file name suffix.
@@ -50,10 +61,282 @@ def recursive_find_files(suffix : str, path : str, list_of_files : List[str]):
     return
 
   # If directory path is provided then call recursive_find_files once for each item in directory
-  for item in os.listdir(path):
+  for item in _listdir_traced(path):
     item_path = os.path.join(path, item)
     recursive_find_files(suffix, item_path, list_of_files)
 
+def _listdir_traced(path : str) -> List[str]:
+  # Lists a directory, counting and timing it when tracing is enabled
+  if not tracing.enabled:
+    return os.listdir(path)
+  tracing.count("find_files.directory")
+  with tracing.span("find_files.listdir"):
+    return os.listdir(path)
+
+class _Inotify:
+  """ Minimal ctypes binding of Linux inotify, reporting which watched directories changed.
+  """
+  _IN_MODIFY_MASK = 0x100 | 0x200 | 0x40 | 0x80 | 0x400 | 0x800 # CREATE, DELETE, MOVED_FROM, MOVED_TO, DELETE_SELF, MOVE_SELF
+  _IN_ONLYDIR = 0x01000000
+  _IN_IGNORED = 0x8000
+  _IN_Q_OVERFLOW = 0x4000
+  _IN_NONBLOCK = os.O_NONBLOCK
+  _IN_CLOEXEC = os.O_CLOEXEC
+  _EVENT_HEADER = struct.Struct("iIII")
+
+  def __init__(self):
+    self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    self.fd = self._libc.inotify_init1(self._IN_NONBLOCK | self._IN_CLOEXEC)
+    if self.fd < 0:
+      raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+    self._paths = {} # watch descriptor -> directory path
+    self._wds = {}   # directory path -> watch descriptor
+
+  def add_watch(self, path : str):
+    wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self._IN_MODIFY_MASK | self._IN_ONLYDIR)
+    if wd < 0:
+      raise OSError(ctypes.get_errno(), "inotify_add_watch failed", path)
+    self._paths[wd] = path
+    self._wds[path] = wd
+
+  def rm_watch(self, path : str):
+    """ Stops watching a directory. Does nothing if it is not watched.
+    """
+    wd = self._wds.pop(path, None)
+    if wd is None:
+      return
+    self._paths.pop(wd, None)
+    # Fails with EINVAL if the kernel already dropped the watch (directory was removed)
+    self._libc.inotify_rm_watch(self.fd, wd)
+
+  def read(self, timeout : float) -> tuple:
+    """ Waits up to timeout seconds for events.
+    
+    Returns:
+        tuple -- (set of changed directories, True if the kernel queue overflowed)
+    """
+    changed = set()
+    overflow = False
+    ready, _, _ = select.select([self.fd], [], [], timeout)
+    while ready:
+      try:
+        buffer = os.read(self.fd, 65536)
+      except BlockingIOError:
+        break
+
+      offset = 0
+      while offset < len(buffer):
+        wd, mask, _, name_len = self._EVENT_HEADER.unpack_from(buffer, offset)
+        offset += self._EVENT_HEADER.size + name_len
+
+        if mask & self._IN_Q_OVERFLOW:
+          overflow = True
+        elif wd in self._paths:
+          changed.add(self._paths[wd])
+          if mask & self._IN_IGNORED:
+            # Directory was removed. Kernel already dropped the watch
+            path = self._paths.pop(wd)
+            if self._wds.get(path) == wd:
+              del self._wds[path]
+    return changed, overflow
+
+  def close(self):
+    os.close(self.fd)
+
+class FileWatcher:
+  """ Keeps a live result of find_files(suffix, path) and reports files as they are added or removed.
+
+      On Linux, inotify reports which directories changed, so an idle tree costs nothing.
+      Directories that can't be watched (e.g. once max_user_watches is reached) fall back
+      to polling. Otherwise, every poll compares the modification time of each known directory with the
+      one seen when it was listed. Either way, only changed directories are listed again.
+      Directories changed within the filesystem's timestamp granularity of being listed
+      are listed again on the next poll, so changes are not missed.
+
+      Considering D as the number of directories and C the number of entries in changed directories:
+        - Time complexity per poll  - O(C) with inotify, O(D + C) when polling
+        - Space complexity          - O(D + F), F being the number of files in the tree
+  """
+  _MTIME_GRANULARITY_NS = 2 * 10**9
+
+  def __init__(self, suffix : str, path : str, callback=None, use_inotify : bool = True):
+    """
+    Arguments:
+        suffix {str} -- File extension
+        path {str} -- Path of the directory to be watched
+    
+    Keyword Arguments:
+        callback {function} -- Called as callback(event, path) for every "added"/"removed" event (default: {None})
+        use_inotify {bool} -- Use inotify when available. Otherwise, poll modification times (default: {True})
+    """
+    # Sanity check: verify if path exists
+    if not os.path.isdir(path):
+      raise ValueError('Provided path is not a directory!')
+
+    self._suffix = suffix
+    self._root = path
+    self._callback = callback
+
+    self._directories = {} # directory path -> (modification time, set of entries)
+    self._dirty = set()    # directories to be listed again on the next poll
+    self._unwatched = set() # directories inotify failed to watch, polled instead
+    self._files = set()
+
+    self._inotify = None
+    if use_inotify and sys.platform.startswith("linux"):
+      try:
+        self._inotify = _Inotify()
+      except (OSError, AttributeError):
+        self._inotify = None
+
+    self._scan_directory(path, [])
+
+  def __enter__(self) -> 'FileWatcher':
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  @property
+  def files(self) -> List[str]:
+    return sorted(self._files)
+
+  @property
+  def uses_inotify(self) -> bool:
+    return self._inotify is not None
+
+  def close(self):
+    if self._inotify is not None:
+      self._inotify.close()
+      self._inotify = None
+
+  def poll(self, timeout : float = 0) -> List[tuple]:
+    """ Waits up to timeout seconds and reports changes since the last poll.
+    
+    Keyword Arguments:
+        timeout {float} -- Seconds to wait for changes (default: {0})
+    
+    Returns:
+        List[tuple] -- ("added" or "removed", file path) events
+    """
+    events = []
+    if self._inotify is not None:
+      changed, overflow = self._inotify.read(timeout)
+      if overflow:
+        changed = set(self._directories)
+      else:
+        changed |= self._changed_directories(self._unwatched)
+    else:
+      if timeout > 0:
+        time.sleep(timeout)
+      changed = self._changed_directories(self._directories)
+
+    changed |= self._dirty
+    self._dirty = set()
+
+    # Parents are listed first, so removed subtrees are not listed again
+    for directory in sorted(changed, key=len):
+      if directory in self._directories:
+        self._rescan_directory(directory, events)
+
+    if self._callback is not None:
+      for event, path in events:
+        self._callback(event, path)
+    return events
+
+  def watch(self, interval : float = 1.0):
+    """ Yields events forever, waiting up to interval seconds between polls.
+    
+    Keyword Arguments:
+        interval {float} -- Seconds between polls (default: {1.0})
+    
+    Yields:
+        tuple -- ("added" or "removed", file path)
+    """
+    while True:
+      yield from self.poll(interval)
+
+  def _changed_directories(self, directories) -> set:
+    # Directories modified since they were listed
+    return {directory for directory in directories if self._mtime(directory) != self._directories[directory][0]}
+
+  def _mtime(self, directory : str) -> int:
+    try:
+      return os.stat(directory).st_mtime_ns
+    except OSError:
+      return None # Directory was removed
+
+  def _list(self, directory : str) -> tuple:
+    # Lists a directory and remembers when it was modified. Directories that might change again
+    # within the same timestamp are flagged to be listed again
+    mtime = self._mtime(directory)
+    try:
+      entries = set(_listdir_traced(directory))
+    except OSError:
+      entries = set()
+
+    if mtime is not None and time.time_ns() - mtime < self._MTIME_GRANULARITY_NS:
+      self._dirty.add(directory)
+    return mtime, entries
+
+  def _scan_directory(self, directory : str, events : List[tuple]):
+    """ Adds a directory, and everything beneath it, to the result.
+    """
+    if self._inotify is not None:
+      # Watch is set before listing, so no entry created in between is missed
+      try:
+        self._inotify.add_watch(directory)
+      except OSError:
+        self._unwatched.add(directory)
+
+    mtime, entries = self._list(directory)
+    self._directories[directory] = (mtime, entries)
+
+    for item in entries:
+      self._add_entry(os.path.join(directory, item), events)
+
+  def _add_entry(self, item_path : str, events : List[tuple]):
+    if os.path.isdir(item_path):
+      if item_path not in self._directories:
+        self._scan_directory(item_path, events)
+    elif item_path.endswith(self._suffix) and item_path not in self._files:
+      self._files.add(item_path)
+      events.append(("added", item_path))
+
+  def _forget_directory(self, directory : str) -> set:
+    # Drops a directory and its watch. Returns its last known entries
+    _, entries = self._directories.pop(directory)
+    self._dirty.discard(directory)
+    self._unwatched.discard(directory)
+    if self._inotify is not None:
+      self._inotify.rm_watch(directory)
+    return entries
+
+  def _remove_entry(self, item_path : str, events : List[tuple]):
+    if item_path in self._directories:
+      entries = self._forget_directory(item_path)
+      for item in entries:
+        self._remove_entry(os.path.join(item_path, item), events)
+    elif item_path in self._files:
+      self._files.remove(item_path)
+      events.append(("removed", item_path))
+
+  def _rescan_directory(self, directory : str, events : List[tuple]):
+    """ Lists a changed directory again and reports the difference with the previous listing.
+    """
+    _, old_entries = self._directories[directory]
+    mtime, entries = self._list(directory)
+    self._directories[directory] = (mtime, entries)
+
+    for item in old_entries - entries:
+      self._remove_entry(os.path.join(directory, item), events)
+    for item in entries - old_entries:
+      self._add_entry(os.path.join(directory, item), events)
+
+    if mtime is None and directory != self._root:
+      # Directory itself was removed. Its parent reports it
+      self._forget_directory(directory)
+
 def test_find_files():
   # Single folder containing one file to be found
   assert(find_files(".c", ".\\problem_2_dir\\subdir1") == ['.\\problem_2_dir\\subdir1\\a.c'])
@@ -81,9 +364,131 @@ def test_find_files():
   else:
     raise ValueError("Error not raised as expected!")
 
+def test_file_watcher(use_inotify : bool):
+  root = tempfile.mkdtemp()
+  try:
+    os.makedirs(os.path.join(root, "subdir1", "subsubdir1"))
+    open(os.path.join(root, "subdir1", "a.c"), "w").close()
+    open(os.path.join(root, "subdir1", "a.h"), "w").close()
+
+    callback_events = []
+    with FileWatcher(".c", root, lambda event, path: callback_events.append((event, path)), use_inotify) as watcher:
+      assert(watcher.files == sorted(find_files(".c", root)))
+      assert(watcher.poll() == [])
+
+      # New file
+      new_file = os.path.join(root, "subdir1", "subsubdir1", "b.c")
+      open(new_file, "w").close()
+      open(os.path.join(root, "subdir1", "subsubdir1", "b.h"), "w").close()
+      assert(watcher.poll(0.1) == [("added", new_file)])
+
+      # New directory containing a file
+      os.makedirs(os.path.join(root, "deepdir", "deepdir1"))
+      deep_file = os.path.join(root, "deepdir", "deepdir1", "c.c")
+      open(deep_file, "w").close()
+      assert(watcher.poll(0.1) == [("added", deep_file)])
+
+      # Renamed and removed files
+      renamed_file = os.path.join(root, "subdir1", "renamed.c")
+      os.rename(new_file, renamed_file)
+      assert(sorted(watcher.poll(0.1)) == [("added", renamed_file), ("removed", new_file)])
+      shutil.rmtree(os.path.join(root, "deepdir"))
+      assert(watcher.poll(0.1) == [("removed", deep_file)])
+
+      # Directory moved out of the tree is no longer watched
+      moved_dir = tempfile.mkdtemp()
+      try:
+        os.rename(os.path.join(root, "subdir1", "subsubdir1"), os.path.join(moved_dir, "subsubdir1"))
+        assert(watcher.poll(0.1) == [])
+        if watcher.uses_inotify:
+          assert(sorted(watcher._inotify._wds) == sorted(watcher._directories))
+          assert(len(watcher._inotify._paths) == len(watcher._directories))
+        open(os.path.join(moved_dir, "subsubdir1", "e.c"), "w").close()
+        assert(watcher.poll(0.1) == [])
+      finally:
+        shutil.rmtree(moved_dir)
+
+      assert(watcher.files == sorted(find_files(".c", root)))
+      assert(watcher.poll() == [])
+      assert(len(callback_events) == 5)
+
+      # Directories that can't be watched are polled instead
+      if watcher.uses_inotify:
+        def add_watch(path : str):
+          raise OSError(errno.ENOSPC, "No space left on device", path)
+        watcher._inotify.add_watch = add_watch
+        # Not flagging recently listed directories shows the polling alone finds the change
+        watcher._MTIME_GRANULARITY_NS = 0
+
+        unwatched_dir = os.path.join(root, "unwatched")
+        os.mkdir(unwatched_dir)
+        assert(watcher.poll(0.1) == [])
+        unwatched_file = os.path.join(unwatched_dir, "d.c")
+        open(unwatched_file, "w").close()
+        assert(watcher.poll(0.1) == [("added", unwatched_file)])
+        shutil.rmtree(unwatched_dir)
+        assert(watcher.poll(0.1) == [("removed", unwatched_file)])
+        assert(watcher._unwatched == set())
+  finally:
+    shutil.rmtree(root)
+
+  try:
+    FileWatcher(".c", os.path.join(root, "where", "am", "i"))
+  except ValueError:
+    pass
+  else:
+    raise ValueError("Error not raised as expected!")
+
+def benchmark_file_watcher(depth : int = 4, fanout : int = 6, duration : float = 5.0, interval : float = 0.5):
+  # CPU time spent per minute keeping the result of an idle tree up to date
+  root = tempfile.mkdtemp()
+  try:
+    level = [root]
+    directories = 1
+    for _ in range(depth):
+      level = [os.path.join(directory, "dir{}".format(index)) for directory in level for index in range(fanout)]
+      directories += len(level)
+      for directory in level:
+        os.makedirs(directory)
+        open(os.path.join(directory, "file.c"), "w").close()
+
+    # Timestamps of a freshly created tree are within the mtime granularity
+    time.sleep(FileWatcher._MTIME_GRANULARITY_NS / 1e9)
+
+    # Initial scan of the watchers is not measured
+    polling_watcher = FileWatcher(".c", root, use_inotify=False)
+    inotify_watcher = FileWatcher(".c", root, use_inotify=True)
+
+    def full_scans():
+      find_files(".c", root)
+      time.sleep(interval)
+
+    for name, function in [("full scans", full_scans),
+                           ("mtime polling", lambda: polling_watcher.poll(interval)),
+                           ("inotify", lambda: inotify_watcher.poll(interval))]:
+      start = time.process_time()
+      deadline = time.monotonic() + duration
+      while time.monotonic() < deadline:
+        function()
+      cpu_time = time.process_time() - start
+      print("{:>6} directories: {:<14} {:>8.3f} CPU s/minute".format(
+        directories, name, cpu_time * 60 / duration))
+
+    polling_watcher.close()
+    inotify_watcher.close()
+  finally:
+    shutil.rmtree(root)
+
 if __name__ == "__main__":
   
+  # Watcher tests build their own tree, so they run on any platform
+  test_file_watcher(use_inotify=True)
+  test_file_watcher(use_inotify=False)
+
   test_find_files()
 
+  if "--benchmark" in sys.argv:
+    benchmark_file_watcher()
+
   print("Tests completed!")
 
@@ -1,4 +1,7 @@
 import sys
+import time
+
+import tracing
 
 class Node:
     def __init__(self, value):
@@ -71,50 +74,51 @@ def huffman_encoding(data : str) -> (str, Tree):
     if len(data) == 0:
         return "", Tree()
 
-    # Determine frequency of each letter
-    freq_dict = {}
-    for letter in data:
-        if letter in freq_dict.keys():
-            freq_dict[letter] += 1
-        else:
-            freq_dict[letter] = 1
-    
-    # Convert dict into list of tuples
-    freq_list = [Node((k, v)) for k, v in freq_dict.items()]
-    freq_list = sorted(freq_list, key = lambda x: -x.value[1]) # sorted is O(n*log(n))
-
-    # Assemble Huffman Tree
-    huffman_tree = Tree()
-
-    # Each letter takes O(log(n)) to be inserted into the tree. 
-    # Assembling the entire tree then takes O(n*log(n))
-    while len(freq_list) > 1:
-        left_node = freq_list.pop()
-        right_node = freq_list.pop()
-        new_node = Node((left_node.value[0] + right_node.value[0],left_node.value[1] + right_node.value[1]))
-
-        new_node.left = left_node
-        new_node.right = right_node
-        
-        next_iter = False
-        for index in range(0, len(freq_list)):
-            if freq_list[index].value[1] == new_node.value[1]:
-                freq_list.insert(index, new_node)
-                next_iter = True
-                break
-
-        if next_iter:
-            continue
-        else:
-            freq_list.append(new_node)
-
-    huffman_tree.root = freq_list[0]
-
-    if not huffman_tree.root.has_left_child() and not huffman_tree.root.has_right_child():
-        root_node = Node(huffman_tree.root.value)
-        root_node.left = huffman_tree.root
-        root_node.right = huffman_tree.root
-        huffman_tree.root = root_node
+    with tracing.span("huffman.build_tree"):
+        # Determine frequency of each letter
+        freq_dict = {}
+        for letter in data:
+            if letter in freq_dict.keys():
+                freq_dict[letter] += 1
+            else:
+                freq_dict[letter] = 1
+
+        # Convert dict into list of tuples
+        freq_list = [Node((k, v)) for k, v in freq_dict.items()]
+        freq_list = sorted(freq_list, key = lambda x: -x.value[1]) # sorted is O(n*log(n))
+
+        # Assemble Huffman Tree
+        huffman_tree = Tree()
+
+        # Each letter takes O(log(n)) to be inserted into the tree. 
+        # Assembling the entire tree then takes O(n*log(n))
+        while len(freq_list) > 1:
+            left_node = freq_list.pop()
+            right_node = freq_list.pop()
+            new_node = Node((left_node.value[0] + right_node.value[0],left_node.value[1] + right_node.value[1]))
+
+            new_node.left = left_node
+            new_node.right = right_node
+
+            next_iter = False
+            for index in range(0, len(freq_list)):
+                if freq_list[index].value[1] == new_node.value[1]:
+                    freq_list.insert(index, new_node)
+                    next_iter = True
+                    break
+
+            if next_iter:
+                continue
+            else:
+                freq_list.append(new_node)
+
+        huffman_tree.root = freq_list[0]
+
+        if not huffman_tree.root.has_left_child() and not huffman_tree.root.has_right_child():
+            root_node = Node(huffman_tree.root.value)
+            root_node.left = huffman_tree.root
+            root_node.right = huffman_tree.root
+            huffman_tree.root = root_node
 
     # Traverse tree to generate dictionary
     huffman_dict = {}
@@ -148,16 +152,19 @@ def huffman_encoding(data : str) -> (str, Tree):
             traverse(node.left, string + "0", huffman_dict)
             traverse(node.right, string + "1", huffman_dict)
 
-    traverse(huffman_tree.root, "", huffman_dict)
+    with tracing.span("huffman.build_codes"):
+        traverse(huffman_tree.root, "", huffman_dict)
 
     # Encode input using the assembled huffman_dict
-    encoded_str = ""
-    for char in data:
-        encoded_str += huffman_dict[char]
+    with tracing.span("huffman.encode"):
+        encoded_str = ""
+        for char in data:
+            encoded_str += huffman_dict[char]
 
     return encoded_str, huffman_tree
 
 
+@tracing.traced("huffman.decode")
 def huffman_decoding(data : str, tree : Tree) -> str:
     """ Decodes data in binary string format using a Huffman Tree.
 
@@ -191,6 +198,212 @@ def huffman_decoding(data : str, tree : Tree) -> str:
             curr_node = tree.root
                 
     return decoded_str
+
+class _AdaptiveNode:
+    """ Compact node of an AdaptiveHuffmanTree. Leaves have no children.
+        index is the position of the node in the tree's list of nodes (lower index = higher order).
+    """
+    __slots__ = ("weight", "symbol", "parent", "left", "right", "index")
+
+    def __init__(self, weight : int, index : int, parent : '_AdaptiveNode' = None, symbol : str = None):
+        self.weight = weight
+        self.symbol = symbol
+        self.parent = parent
+        self.left = None
+        self.right = None
+        self.index = index
+
+class AdaptiveHuffmanTree:
+    """ Huffman Tree updated one symbol at a time using the FGK algorithm.
+        Encoder and decoder perform the same updates, so no tree needs to be sent with the data.
+
+        Symbols that were never seen are reached through the NYT (Not Yet Transmitted) leaf and
+        are followed by their code point in SYMBOL_BITS bits.
+
+        Nodes are kept in a list ordered by weight (sibling property). Finding the node to
+        swap with is a binary search, so each update takes O(d*log(n)), where d is the depth
+        of the tree and n the number of distinct symbols.
+    """
+    SYMBOL_BITS = 21 # Enough for every unicode code point
+
+    def __init__(self):
+        self.nyt = _AdaptiveNode(0, 0)
+        self.root = self.nyt
+        self._nodes = [self.root]   # Weights never increase along the list
+        self._leaves = {}           # symbol -> leaf
+
+    def code(self, symbol : str) -> str:
+        """ Returns the bits identifying symbol in the current tree. O(d)
+        
+        Arguments:
+            symbol {str} -- Single character
+        
+        Returns:
+            str -- Path to the leaf, or path to NYT followed by the code point of a new symbol
+        """
+        node = self._leaves.get(symbol)
+        new_symbol = node is None
+        if new_symbol:
+            node = self.nyt
+
+        path = []
+        while node.parent is not None:
+            path.append("0" if node.parent.left is node else "1")
+            node = node.parent
+        path.reverse()
+
+        if new_symbol:
+            path.append(format(ord(symbol), "0{}b".format(self.SYMBOL_BITS)))
+        return "".join(path)
+
+    def update(self, symbol : str):
+        """ Increments the weight of symbol, swapping nodes to keep the sibling property.
+        
+        Arguments:
+            symbol {str} -- Single character
+        """
+        node = self._leaves.get(symbol)
+        if node is None:
+            # NYT becomes an internal node with the new symbol and a new NYT as children
+            old_nyt = self.nyt
+            node = _AdaptiveNode(0, len(self._nodes), old_nyt, symbol)
+            self.nyt = _AdaptiveNode(0, len(self._nodes) + 1, old_nyt)
+            old_nyt.left = self.nyt
+            old_nyt.right = node
+            self._nodes += [node, self.nyt]
+            self._leaves[symbol] = node
+
+            # Both were the only nodes with weight 0, so no swap is needed
+            node.weight = 1
+            old_nyt.weight = 1
+            node = old_nyt.parent
+
+        while node is not None:
+            leader = self._leader(node)
+            if leader is not node and leader is not node.parent:
+                self._swap(node, leader)
+            node.weight += 1
+            node = node.parent
+
+    def _leader(self, node : _AdaptiveNode) -> _AdaptiveNode:
+        # Highest ordered node with the same weight as node. Binary search for the first weight <= node.weight.
+        # Only nodes ordered above node are searched, since they are not touched by the ongoing update
+        low = 0
+        high = node.index
+        while low < high:
+            middle = (low + high) // 2
+            if self._nodes[middle].weight > node.weight:
+                low = middle + 1
+            else:
+                high = middle
+        return self._nodes[low]
+
+    def _swap(self, node_1 : _AdaptiveNode, node_2 : _AdaptiveNode):
+        # Exchanges the position of two subtrees in both the tree and the list of nodes
+        self._nodes[node_1.index], self._nodes[node_2.index] = node_2, node_1
+        node_1.index, node_2.index = node_2.index, node_1.index
+
+        parent_1 = node_1.parent
+        parent_2 = node_2.parent
+        if parent_1 is parent_2:
+            parent_1.left, parent_1.right = parent_1.right, parent_1.left
+            return
+
+        if parent_1.left is node_1:
+            parent_1.left = node_2
+        else:
+            parent_1.right = node_2
+        if parent_2.left is node_2:
+            parent_2.left = node_1
+        else:
+            parent_2.right = node_1
+        node_1.parent, node_2.parent = parent_2, parent_1
+
+class AdaptiveHuffmanEncoder:
+    """ Single pass Huffman encoder. Each symbol is encoded as soon as it arrives.
+    """
+    def __init__(self):
+        self._tree = AdaptiveHuffmanTree()
+
+    def encode(self, data : str) -> str:
+        """ Encodes the next chunk of data. O(n*d*log(k)) for n symbols
+        
+        Arguments:
+            data {str} -- Next characters of the stream
+        
+        Returns:
+            str -- Encoded data in a binary string
+        """
+        encoded = []
+        for char in data:
+            encoded.append(self._tree.code(char))
+            self._tree.update(char)
+        return "".join(encoded)
+
+class AdaptiveHuffmanDecoder:
+    """ Single pass Huffman decoder. Bits can be fed in chunks of any size;
+        symbols are returned as soon as their last bit arrives.
+    """
+    def __init__(self):
+        self._tree = AdaptiveHuffmanTree()
+        self._node = self._tree.root
+        self._symbol_bits = [] # Code point of a new symbol being read. None while walking the tree
+
+    def decode(self, data : str) -> str:
+        """ Decodes the next chunk of bits.
+        
+        Arguments:
+            data {str} -- Next bits of the stream in a binary string
+        
+        Returns:
+            str -- Symbols completed by this chunk
+        """
+        decoded = []
+        for bit in data:
+            if self._symbol_bits is not None:
+                self._symbol_bits.append(bit)
+                if len(self._symbol_bits) == AdaptiveHuffmanTree.SYMBOL_BITS:
+                    self._emit(chr(int("".join(self._symbol_bits), 2)), decoded)
+                continue
+
+            self._node = self._node.left if bit == "0" else self._node.right
+            if self._node.left is None:
+                if self._node is self._tree.nyt:
+                    self._symbol_bits = []
+                else:
+                    self._emit(self._node.symbol, decoded)
+        return "".join(decoded)
+
+    def _emit(self, symbol : str, decoded : list):
+        decoded.append(symbol)
+        self._tree.update(symbol)
+        self._node = self._tree.root
+        self._symbol_bits = None
+
+@tracing.traced("huffman.adaptive_encode")
+def adaptive_huffman_encoding(data : str) -> str:
+    """ Encodes data in a single pass using an AdaptiveHuffmanTree. No tree is returned,
+        since the decoder rebuilds it from the encoded data.
+    
+    Arguments:
+        data {str} -- Data to be encoded
+    
+    Returns:
+        str -- Encoded data in a binary string
+    """
+    return AdaptiveHuffmanEncoder().encode(data)
+
+@tracing.traced("huffman.adaptive_decode")
+def adaptive_huffman_decoding(data : str) -> str:
+    """ Decodes data encoded by adaptive_huffman_encoding().
+    
+    Arguments:
+        data {str} -- String containing data in binary format
+    
+    Returns:
+        str -- Decoded data in string format
+    """
+    return AdaptiveHuffmanDecoder().decode(data)
     
 def test_huffman(data : str):
     print("===========================================================")
@@ -209,6 +422,39 @@ def test_huffman(data : str):
 
     assert(decoded_data == data)
 
+def test_adaptive_huffman(data : str):
+    encoded_data = adaptive_huffman_encoding(data)
+    assert(adaptive_huffman_decoding(encoded_data) == data)
+
+    # Streaming in chunks gives the same bits and symbols
+    encoder = AdaptiveHuffmanEncoder()
+    chunks = [encoder.encode(data[i:i + 3]) for i in range(0, len(data), 3)]
+    assert("".join(chunks) == encoded_data)
+
+    decoder = AdaptiveHuffmanDecoder()
+    decoded_data = "".join(decoder.decode(encoded_data[i:i + 5]) for i in range(0, len(encoded_data), 5))
+    assert(decoded_data == data)
+
+def benchmark_adaptive_huffman(size : int = 100000):
+    # Compares compression ratio and speed of static (two pass) and adaptive (single pass) coding
+    words = ["the", "bird", "is", "word", "a-well-a", "everybody's", "heard", "about", "b-bird's"]
+    data = " ".join(words[(i * i) % len(words)] for i in range(size // 5))
+
+    start = time.perf_counter()
+    encoded_data, tree = huffman_encoding(data)
+    huffman_decoding(encoded_data, tree)
+    static_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    adaptive_data = adaptive_huffman_encoding(data)
+    adaptive_huffman_decoding(adaptive_data)
+    adaptive_time = time.perf_counter() - start
+
+    print("{:>8} chars: static   ratio {:.3f}, {:>10.0f} chars/s (tree sent separately)".format(
+        len(data), len(encoded_data) / (8 * len(data)), len(data) / static_time))
+    print("{:>8} chars: adaptive ratio {:.3f}, {:>10.0f} chars/s".format(
+        len(data), len(adaptive_data) / (8 * len(data)), len(data) / adaptive_time))
+
 if __name__ == "__main__":
     codes = {}
 
@@ -226,4 +472,13 @@ if __name__ == "__main__":
 
     # An even greater sentence
     test_huffman("A-well-a everybody's heard about the bird! Bird bird bird, b-bird's the word!")
+
+    test_adaptive_huffman("")
+    test_adaptive_huffman("B")
+    test_adaptive_huffman("BBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBBB")
+    test_adaptive_huffman("The bird is the word")
+    test_adaptive_huffman("A-well-a everybody's heard about the bird! Bird bird bird, b-bird's the word! Ação ✓")
+
+    if "--benchmark" in sys.argv:
+        benchmark_adaptive_huffman()
     
\ No newline at end of file
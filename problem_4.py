@@ -1,6 +1,13 @@
 import warnings
 
+import tracing
+
+from problem_1 import LRU_Cache
+
 class Group(object):
+    # Incremented on every change to any group. Used to invalidate cached lookups
+    generation = 0
+
     def __init__(self, _name):
         self.name = _name
         self.groups = []
@@ -8,9 +15,11 @@ class Group(object):
 
     def add_group(self, group):
         self.groups.append(group)
+        Group.generation += 1
 
     def add_user(self, user):
         self.users.append(user)
+        Group.generation += 1
 
     def get_groups(self):
         return self.groups
@@ -42,6 +51,9 @@ def is_user_in_group(user : str, group : Group) -> bool:
         warnings.warn("Argument group is not an instance of the Group class", Warning)
         return False
 
+    if tracing.enabled:
+        tracing.count("group.visit")
+
     if user in group.get_users():
         # User is in group
         return True
@@ -52,6 +64,79 @@ def is_user_in_group(user : str, group : Group) -> bool:
                 return True
     return False
 
+class MembershipCache(object):
+    """ Memoizes is_user_in_group() answers in a LRU_Cache keyed by (user, group).
+        Both positive and negative answers are stored for every sub-group visited,
+        so repeated queries are O(1) and a miss only traverses groups not yet cached.
+        Memory is bounded by the capacity of the LRU_Cache.
+
+        The whole cache is dropped whenever Group.generation changes, which happens
+        on any add_user()/add_group() call, so stale answers are never returned.
+    """
+    def __init__(self, capacity : int):
+        self._capacity = capacity
+        self._cache = LRU_Cache(capacity)
+        self._generation = Group.generation
+
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        if total == 0:
+            return 0.0
+        return self.hits / total
+
+    def clear(self):
+        """ Removes all cached answers. Hit/miss counters are kept.
+        """
+        self._cache = LRU_Cache(self._capacity)
+        self._generation = Group.generation
+
+    def is_user_in_group(self, user : str, group : Group) -> bool:
+        """ Cached version of is_user_in_group().
+            O(1) when the answer is cached, O(n) otherwise.
+
+        Arguments:
+            user {str} -- user name/id
+            group {Group} -- group to check user membership against
+
+        Returns:
+            bool -- True if user is in the group, False otherwise.
+        """
+        # Sanity check: Is the provided group of the type Group?
+        if not isinstance(group, Group):
+            warnings.warn("Argument group is not an instance of the Group class", Warning)
+            return False
+
+        # Hierarchy changed since the answers were cached
+        if self._generation != Group.generation:
+            self.clear()
+
+        return self._lookup(user, group)
+
+    def _lookup(self, user : str, group : Group) -> bool:
+        cached = self._cache.get((user, group))
+        if cached != -1:
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        if tracing.enabled:
+            tracing.count("group.visit")
+
+        result = user in group.get_users()
+        if not result:
+            # Check if user is in any of the subgroups, caching each answer
+            for elem in group.get_groups():
+                if isinstance(elem, Group) and self._lookup(user, elem):
+                    result = True
+                    break
+
+        self._cache.set((user, group), result)
+        return result
+
 def test_edge_cases():
     
     null_group = Group(None) # Group name is not used
@@ -133,6 +218,43 @@ def test_big_group():
     assert(is_user_in_group("orphan", first_child) == False)
     assert(is_user_in_group("orphan", second_child) == False)
 
+def test_membership_cache():
+
+    parent = Group("parent")
+    child = Group("child")
+    sub_child = Group("subchild")
+
+    child.add_group(sub_child)
+    parent.add_group(child)
+    sub_child.add_user("sub_child_user")
+
+    cache = MembershipCache(10)
+
+    assert(cache.is_user_in_group("sub_child_user", parent) == True)
+    assert(cache.misses == 3)
+    # Answers for the sub-groups were cached during the first lookup
+    assert(cache.is_user_in_group("sub_child_user", child) == True)
+    assert(cache.is_user_in_group("sub_child_user", parent) == True)
+    assert(cache.hits == 2)
+
+    # Negative answers are cached too
+    assert(cache.is_user_in_group("orphan", parent) == False)
+    assert(cache.is_user_in_group("orphan", parent) == False)
+    assert(cache.hits == 3)
+
+    # Changing the hierarchy invalidates cached answers
+    child.add_user("orphan")
+    assert(cache.is_user_in_group("orphan", parent) == True)
+    assert(cache.is_user_in_group("orphan", sub_child) == False)
+
+    # Capacity bounds the number of cached answers
+    small_cache = MembershipCache(1)
+    assert(small_cache.is_user_in_group("sub_child_user", parent) == True)
+    assert(small_cache.is_user_in_group("sub_child_user", child) == True)
+    assert(small_cache.misses == 5)
+
+    assert(cache.is_user_in_group("orphan", "i am no group") == False)
+    assert(MembershipCache(0).is_user_in_group("sub_child_user", parent) == True)
 
 
 if __name__ == "__main__":
@@ -141,4 +263,6 @@ if __name__ == "__main__":
 
     test_standard_group()
 
-    test_big_group()
\ No newline at end of file
+    test_big_group()
+
+    test_membership_cache()
\ No newline at end of file
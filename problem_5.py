@@ -1,6 +1,91 @@
 import hashlib
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
 
-from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import tracing
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_GENESIS_DIGEST = bytes(32)
+_COMPACT_HEADER = struct.Struct("<q32s")
+
+def calc_hash(timestamp : datetime, data : str, previous_hash : str) -> str:
+  """ Converts timestamp, data and previous_hash into a SHA256 hash.
+      Hashing to sha256 has the complexity of O(n), since each character is visited once.
+  Returns:
+      string -- Hexadecimal SHA256 hash in string format
+  """
+  if tracing.enabled:
+    tracing.count("block.calc_hash")
+
+  sha = hashlib.sha256()
+
+  date_string = timestamp.strftime("%H:%M:%S %d/%m/%Y") # Convert date to string format
+
+  hash_str = (date_string + " - "+ data  + " - " + previous_hash) # Assemble block info for hashing
+  hash_str_utf8 = hash_str.encode('utf-8')
+
+  sha.update(hash_str_utf8)
+
+  return sha.hexdigest()
+
+def calc_compact_digest(timestamp_ns : int, data : bytes, previous_digest : bytes) -> bytes:
+  """ Hashes the fixed binary layout of a CompactBlock:
+        timestamp (int64, nanoseconds since epoch) | previous digest (32 bytes) | data (utf-8)
+      No formatting is involved. O(n) on the size of data
+  Returns:
+      bytes -- Raw 32-byte SHA256 digest
+  """
+  if tracing.enabled:
+    tracing.count("block.calc_hash")
+
+  sha = hashlib.sha256(_COMPACT_HEADER.pack(timestamp_ns, previous_digest))
+  sha.update(data)
+  return sha.digest()
+
+def calc_compact_hash(timestamp_ns : int, data : bytes, previous_hash : str) -> str:
+  """ Same as calc_compact_digest(), using hexadecimal hashes like calc_hash().
+  Returns:
+      string -- Hexadecimal SHA256 hash in string format
+  """
+  previous_digest = _GENESIS_DIGEST if previous_hash == "0" else bytes.fromhex(previous_hash)
+  return calc_compact_digest(timestamp_ns, data, previous_digest).hex()
+
+def _verify_chunk(start_height : int, records : list, previous_hash : str) -> int:
+  """ Validates a contiguous slice of the chain. Runs in a worker process.
+      Each record is a (hash function, timestamp, data, previous_hash, hash) tuple,
+      as returned by Block.hash_record(). For a BatchBlock the data is its list of
+      records, so they are checked against the Merkle root as well. O(k)
+  
+  Arguments:
+      start_height {int} -- Height of the first record
+      records {list} -- Block fields in chain order
+      previous_hash {str} -- Stored hash of the block preceding the slice
+  
+  Returns:
+      int -- Height of the first invalid block. -1 if all blocks are valid.
+  """
+  for offset, (hash_function, timestamp, data, block_previous_hash, block_hash) in enumerate(records):
+    if block_previous_hash != previous_hash or block_hash != hash_function(timestamp, data, block_previous_hash):
+      return start_height + offset
+    previous_hash = block_hash
+  return -1
+
+def calc_batch_hash(timestamp : datetime, records : tuple, previous_hash : str) -> str:
+  """ Hashes a BatchBlock from its records instead of its stored Merkle root,
+      so a tampered record changes the result. O(n) on the total size of records
+  Returns:
+      string -- Hexadecimal SHA256 hash in string format
+  """
+  return calc_hash(timestamp, merkle_root(records), previous_hash)
 
 class Block:
 
@@ -19,16 +104,30 @@ class Block:
       Returns:
           string -- Hexadecimal SHA256 hash in string format
       """
-      sha = hashlib.sha256()
+      return calc_hash(self.timestamp, self.data, self.previous_hash)
 
-      date_string = self.timestamp.strftime("%H:%M:%S %d/%m/%Y") # Convert date to string format
-      
-      hash_str = (date_string + " - "+ self.data  + " - " + self.previous_hash) # Assemble block info for hashing
-      hash_str_utf8 = hash_str.encode('utf-8')
-      
-      sha.update(hash_str_utf8)
+  @classmethod
+  def from_fields(cls, timestamp : datetime, data : str, previous_hash : str, hash : str) -> 'Block':
+    """ Creates a block from previously stored values. The hash is not recomputed.
+    
+    Returns:
+        Block -- Block holding the provided values
+    """
+    block = cls.__new__(cls)
+    block._timestamp = timestamp
+    block._data = data
+    block._previous_hash = previous_hash
+    block._hash = hash
+    block._next = None
+    return block
 
-      return sha.hexdigest()
+  def hash_record(self) -> tuple:
+    """ Returns the values needed to check the block's hash without the Block object.
+    
+    Returns:
+        tuple -- (hash function, timestamp, data, previous_hash, hash)
+    """
+    return (calc_hash, self.timestamp, self.data, self.previous_hash, self.hash)
 
   @property
   def timestamp(self) -> datetime:
@@ -54,39 +153,345 @@ class Block:
   def previous_hash(self) -> str:
     return self._previous_hash
 
+class CompactBlock:
+  """ Memory efficient alternative to Block with the same interface.
+      Uses __slots__, raw 32-byte digests, UTF-8 encoded data and an integer
+      nanosecond timestamp, which are hashed directly by calc_compact_digest().
+      Hexadecimal hashes, str data and datetime are only created when the properties are read.
+  """
+  __slots__ = ("_timestamp_ns", "_data", "_previous_digest", "_digest", "next")
+
+  def __init__(self, data : str, previous_hash):
+    self._timestamp_ns = time.time_ns()
+    self._data = data.encode('utf-8')
+
+    # Accepts the previous digest directly, so it is shared with the previous block
+    if isinstance(previous_hash, bytes):
+      self._previous_digest = previous_hash
+    else:
+      self._previous_digest = _GENESIS_DIGEST if previous_hash == "0" else bytes.fromhex(previous_hash)
+    self._digest = self.calc_digest()
+
+    self.next = None
+
+  def calc_digest(self) -> bytes:
+    return calc_compact_digest(self._timestamp_ns, self._data, self._previous_digest)
+
+  def calc_hash(self) -> str:
+    return self.calc_digest().hex()
+
+  def hash_record(self) -> tuple:
+    return (calc_compact_hash, self._timestamp_ns, self._data, self.previous_hash, self.hash)
+
+  @property
+  def timestamp_ns(self) -> int:
+    return self._timestamp_ns
+
+  @property
+  def timestamp(self) -> datetime:
+    return _EPOCH + timedelta(microseconds=self._timestamp_ns // 1000)
+
+  @property
+  def data(self) -> str:
+    return self._data.decode('utf-8')
+
+  @property
+  def digest(self) -> bytes:
+    return self._digest
+
+  @property
+  def hash(self) -> str:
+    return self._digest.hex()
+
+  @property
+  def previous_digest(self) -> bytes:
+    return self._previous_digest
+
+  @property
+  def previous_hash(self) -> str:
+    return "0" if self._previous_digest == _GENESIS_DIGEST else self._previous_digest.hex()
+
+def _merkle_levels(records : list) -> list:
+  """ Builds every level of the Merkle tree of records, from the leaves up to the root.
+      The last node of an odd level is promoted to the next level unchanged. Duplicating
+      it instead would give a batch and the same batch with its last record repeated the
+      same root. Leaves and inner nodes use different prefixes so a leaf can't be passed
+      off as an inner node. O(n)
+  
+  Arguments:
+      records {list} -- Records (str) stored in the tree
+  
+  Returns:
+      list -- Lists of SHA256 digests. Last list holds only the root
+  """
+  level = [hashlib.sha256(b"\x00" + record.encode('utf-8')).digest() for record in records]
+  levels = [level]
+  while len(level) > 1:
+    next_level = [hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest() for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2 == 1:
+      next_level.append(level[-1])
+    level = next_level
+    levels.append(level)
+  return levels
+
+def merkle_root(records : list) -> str:
+  """ Returns the Merkle root of records. O(n)
+  
+  Arguments:
+      records {list} -- Records (str) stored in the tree
+  
+  Returns:
+      str -- Hexadecimal SHA256 hash of the root
+  """
+  return _merkle_levels(records)[-1][0].hex()
+
+def verify_merkle_proof(record : str, proof : list, root : str) -> bool:
+  """ Checks that record is included in the Merkle tree with the provided root.
+      One hash per level of the tree. O(log(n))
+  
+  Arguments:
+      record {str} -- Record to be checked
+      proof {list} -- (sibling hash, sibling is on the left) tuples, as returned by BatchBlock.proof()
+      root {str} -- Merkle root stored in the block
+  
+  Returns:
+      bool -- True if record is part of the tree. Otherwise, false.
+  """
+  node = hashlib.sha256(b"\x00" + record.encode('utf-8')).digest()
+  for sibling_hash, is_left in proof:
+    sibling = bytes.fromhex(sibling_hash)
+    if is_left:
+      node = hashlib.sha256(b"\x01" + sibling + node).digest()
+    else:
+      node = hashlib.sha256(b"\x01" + node + sibling).digest()
+  return node.hex() == root
+
+class BatchBlock(Block):
+  """ Block holding many records. Its data is the Merkle root of the records,
+      so the block hash commits to every record.
+      The tree levels are kept so inclusion proofs take O(log(n)).
+  """
+  def __init__(self, records : list, previous_hash : str):
+    if len(records) == 0:
+      raise ValueError('Batch must contain at least one record')
+
+    self._records = tuple(records)
+    self._levels = _merkle_levels(self._records)
+    super().__init__(self._levels[-1][0].hex(), previous_hash)
+
+  @property
+  def records(self) -> tuple:
+    return self._records
+
+  def proof(self, index : int) -> list:
+    """ Returns the inclusion proof of the record at the provided index. O(log(n))
+    
+    Arguments:
+        index {int} -- Position of the record in the batch
+    
+    Returns:
+        list -- (sibling hash, sibling is on the left) tuples, from the leaves up to the root
+    """
+    if not 0 <= index < len(self._records):
+      raise IndexError('Record index out of range')
+
+    proof = []
+    for level in self._levels[:-1]:
+      sibling = index ^ 1
+      # A promoted last node has no sibling on this level
+      if sibling < len(level):
+        proof.append((level[sibling].hex(), sibling < index))
+      index //= 2
+    return proof
+
+  def hash_record(self) -> tuple:
+    """ Returns the values needed to check the block's hash and records without the Block object.
+    
+    Returns:
+        tuple -- (hash function, timestamp, records, previous_hash, hash)
+    """
+    return (calc_batch_hash, self.timestamp, self._records, self.previous_hash, self.hash)
+
+  def validate_records(self) -> bool:
+    """ Returns whether the stored records still match the Merkle root in data. O(n)
+    """
+    return merkle_root(self._records) == self.data
+
 class Blockchain:
 
-  def __init__(self):
+  def __init__(self, block_class : type = Block):
+    self._block_class = block_class # Block or CompactBlock
+
     self.head = None
+    self.tail = None
+
+    # Indexes for random access. Kept in sync by append()
+    self._blocks = []       # height -> block
+    self._hash_index = {}   # raw SHA256 digest -> block
+
+    # Checkpoint: blocks before _verified_length have already been validated
+    self._verified_length = 0
+
+  def __len__(self) -> int:
+    return len(self._blocks)
+
+  @property
+  def verified_length(self) -> int:
+    return self._verified_length
 
   def append(self, data : str):
     """ Crates block containing the specified data and appends it to the end of the blockchain
-        Requires traversing the list. O(n)
+        Uses the tail pointer, so no traversal is required. O(1)
+        Validation is done separately by verify()
     
     Arguments:
         data {str} -- Data to be stored in the blockchain
+    """
+    if self.tail is None:
+      previous_hash = "0"
+    elif isinstance(self.tail, CompactBlock):
+      previous_hash = self.tail.digest
+    else:
+      previous_hash = self.tail.hash
+    self._append_block(self._block_class(data, previous_hash))
+
+  def append_batch(self, records : list):
+    """ Creates a single BatchBlock containing all records and appends it to the end of the blockchain.
+        Hashing the Merkle tree is O(n). Appending the block is O(1)
     
-    Raises:
-        ValueError: Error raised in an invalid block is found in the blockchain
+    Arguments:
+        records {list} -- Records (str) to be stored in the blockchain
     """
+    previous_hash = "0" if self.tail is None else self.tail.hash
+    self._append_block(BatchBlock(records, previous_hash))
+
+  def _append_block(self, block : Block):
     # Creates a head if there is none
     if self.head is None:
-        self.head = Block(data, "0")
-        return
+        self.head = block
+    else:
+        # Adds new block to the end of the chain
+        self.tail.next = block
+    self.tail = block
+
+    self._blocks.append(block)
+    digest = block.digest if isinstance(block, CompactBlock) else bytes.fromhex(block.hash)
+    self._hash_index[digest] = block
 
-    block = self.head
+  def get_by_hash(self, hash : str) -> Block:
+    """ Returns the block with the provided hash. Dictionary lookup, O(1)
     
-    # Finds the last block in the chain
-    while block.next is not None:
-      previous_hash = block.hash # Stores block's hash before retrieving new block
-      block = block.next
+    Arguments:
+        hash {str} -- Hash of the block
+    
+    Returns:
+        Block -- Block with the provided hash. None if nonexistent.
+    """
+    # Index is keyed by digests of the same size whichever block class is used
+    try:
+      digest = bytes.fromhex(hash)
+    except ValueError:
+      return None # Not a hexadecimal hash, e.g. "0"
+    return self._hash_index.get(digest)
+
+  def get_by_height(self, height : int) -> Block:
+    """ Returns the block at the provided position (0 is the head). List lookup, O(1)
+    
+    Arguments:
+        height {int} -- Position of the block in the chain
+    
+    Returns:
+        Block -- Block at the provided height. None if nonexistent.
+    """
+    if 0 <= height < len(self._blocks):
+      return self._blocks[height]
+    return None
+
+  def blocks(self, start : int = 0, stop : int = None):
+    """ Iterates over the blocks from height start up to, but not including, stop.
+        Uses the height index, so reaching start is O(1)
+    
+    Keyword Arguments:
+        start {int} -- Height of the first block (default: {0})
+        stop {int} -- Height after the last block (default: {None}, end of the chain)
+    
+    Yields:
+        Block -- Blocks in chain order
+    """
+    if stop is None or stop > len(self._blocks):
+      stop = len(self._blocks)
+    for height in range(max(start, 0), stop):
+      yield self._blocks[height]
+
+  def verify(self, from_index : int = None) -> bool:
+    """ Validates every block from from_index to the end of the chain.
+        By default only the blocks appended since the last successful verify() are checked.
+        O(k), where k is the number of blocks checked
+
+        Each block must hold the hash of the previous block and its own hash must match its content.
+        Records of a BatchBlock must match its Merkle root.
+    
+    Keyword Arguments:
+        from_index {int} -- Index of the first block to be validated (default: {None}, last checkpoint)
+    
+    Returns:
+        bool -- True if all checked blocks are valid. Otherwise, false.
+    """
+    if from_index is None:
+      from_index = self._verified_length
+
+    if from_index < 0:
+      raise ValueError('from_index must not be negative')
 
-      # Validates current block
-      if not self.validate_block(block, previous_hash):
-        raise ValueError('Found invalid block"') # Not sure which error is more appropriate
-      
-    # Adds new block to the end of the chain  
-    block.next = Block(data, block.hash)
+    previous_block = self.get_by_height(from_index - 1)
+    previous_hash = "0" if previous_block is None else previous_block.hash
+
+    for block in self.blocks(from_index):
+      if not self.validate_block(block, previous_hash) or block.hash != block.calc_hash():
+        return False
+      if isinstance(block, BatchBlock) and not block.validate_records():
+        return False
+      previous_hash = block.hash
+
+    # Moves checkpoint only if all blocks up to the end of the chain are known to be valid
+    if from_index <= self._verified_length:
+      self._verified_length = len(self._blocks)
+
+    return True
+
+  def verify_parallel(self, workers : int = None) -> int:
+    """ Validates the entire chain using a pool of worker processes.
+        The chain is split into contiguous chunks. Each chunk is checked by
+        _verify_chunk() using the stored hash of the block preceding it, so
+        links at chunk boundaries are validated as well. Records of a BatchBlock
+        are checked against its Merkle root, as in verify().
+        O(n/w) per worker, where w is the number of workers
+
+    Keyword Arguments:
+        workers {int} -- Number of worker processes (default: {None}, number of CPUs)
+
+    Returns:
+        int -- Height of the first invalid block. -1 if the chain is valid.
+    """
+    if workers is None:
+      workers = os.cpu_count() or 1
+
+    # Several chunks per worker keep the pool busy when chunks finish unevenly
+    chunk_size = max(1, -(-len(self._blocks) // (workers * 4)))
+
+    starts = list(range(0, len(self._blocks), chunk_size))
+    chunks = [[b.hash_record() for b in self.blocks(start, start + chunk_size)]
+              for start in starts]
+    boundary_hashes = ["0" if start == 0 else self._blocks[start - 1].hash for start in starts]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+      # Results come back in chain order, so the first invalid one has the lowest height
+      for invalid_height in executor.map(_verify_chunk, starts, chunks, boundary_hashes):
+        if invalid_height != -1:
+          return invalid_height
+
+    self._verified_length = len(self._blocks)
+    return -1
 
   def validate_block(self, block : Block, hash : str) -> bool:
     """ Returns whether provided block has the correct hash of the previous block
@@ -101,6 +506,276 @@ class Blockchain:
     return block.previous_hash == hash
 
 
+class BatchWriter:
+  """ Buffers records and appends them to a Blockchain as BatchBlocks.
+      A batch is flushed once it holds max_records records or once max_delay seconds
+      have passed since its first record. The delay is checked when records are added
+      and by poll(), which callers run periodically (e.g. from their event loop) so a
+      batch that stops receiving records is still flushed. No background thread is used.
+      Remaining records are flushed on exit.
+  """
+  def __init__(self, blockchain : Blockchain, max_records : int = 1000, max_delay : float = None):
+    if max_records < 1:
+      raise ValueError('max_records must be at least 1')
+
+    self._blockchain = blockchain
+    self._max_records = max_records
+    self._max_delay = max_delay
+
+    self._pending = []
+    self._first_pending_time = None
+
+  def __enter__(self) -> 'BatchWriter':
+    return self
+
+  def __exit__(self, *args):
+    self.flush()
+
+  def __len__(self) -> int:
+    return len(self._pending)
+
+  def add(self, record : str):
+    """ Buffers record. Flushes the batch when it is full or too old. O(1), plus flushing
+    
+    Arguments:
+        record {str} -- Record to be stored in the blockchain
+    """
+    if not self._pending:
+      self._first_pending_time = time.monotonic()
+    self._pending.append(record)
+
+    if len(self._pending) >= self._max_records:
+      self.flush()
+    else:
+      self.poll()
+
+  def poll(self) -> bool:
+    """ Flushes the batch if max_delay seconds have passed since its first record. O(1), plus flushing
+    
+    Returns:
+        bool -- True if a batch was flushed. Otherwise, false.
+    """
+    if self._pending and self._max_delay is not None and time.monotonic() - self._first_pending_time >= self._max_delay:
+      self.flush()
+      return True
+    return False
+
+  def flush(self):
+    """ Appends all buffered records to the blockchain as a single BatchBlock.
+    """
+    if self._pending:
+      self._blockchain.append_batch(self._pending)
+      self._pending = []
+      self._first_pending_time = None
+
+
+class BlockLog:
+  """ Append-only on-disk storage for a blockchain.
+      Each block is written as a fixed-size header followed by its data:
+        timestamp (int64, microseconds since epoch) | previous hash (32 bytes) | hash (32 bytes) | data length (uint32) | data (utf-8)
+      The genesis previous hash "0" is stored as 32 zero bytes.
+
+      Record offsets and a hash -> height dictionary are kept in memory. Reads go through mmap,
+      and Block objects are only created when a block is requested. Reopening a log only
+      scans the headers, so no hash is recomputed. O(n) to open, O(1) to append and to read a block.
+  """
+  _HEADER = struct.Struct("<q32s32sI")
+
+  def __init__(self, path : str):
+    self._path = path
+    self._file = open(path, "a+b")
+    self._mmap = None
+    self._size = 0
+
+    self._offsets = []      # height -> offset of the record in the file
+    self._hash_index = {}   # hash -> height
+    self._tail_hash = "0"
+
+    # Checkpoint: blocks before _verified_length have already been validated. Not persisted
+    self._verified_length = 0
+
+    self._load()
+
+  def __enter__(self) -> 'BlockLog':
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+  def __len__(self) -> int:
+    return len(self._offsets)
+
+  @property
+  def verified_length(self) -> int:
+    return self._verified_length
+
+  def close(self):
+    # Memory map is released once no memoryview returned by data_view() references it
+    self._mmap = None
+    self._file.close()
+
+  def sync(self):
+    """ Forces written blocks to disk.
+    """
+    self._file.flush()
+    os.fsync(self._file.fileno())
+
+  def _load(self):
+    """ Rebuilds the offset and hash indexes by scanning record headers.
+        A partially written record at the end of the file is discarded.
+    """
+    file_size = os.path.getsize(self._path)
+    if file_size == 0:
+      return
+
+    view = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+    offset = 0
+    while offset + self._HEADER.size <= file_size:
+      _, _, block_hash, data_len = self._HEADER.unpack_from(view, offset)
+      end = offset + self._HEADER.size + data_len
+      if end > file_size:
+        break
+      self._hash_index[self._decode_hash(block_hash)] = len(self._offsets)
+      self._offsets.append(offset)
+      offset = end
+    view.close()
+
+    if offset < file_size:
+      self._file.truncate(offset)
+
+    self._size = offset
+    if self._offsets:
+      self._tail_hash = self._read_header(len(self._offsets) - 1)[2]
+
+  def _encode_hash(self, hash : str) -> bytes:
+    return _GENESIS_DIGEST if hash == "0" else bytes.fromhex(hash)
+
+  def _decode_hash(self, hash : bytes) -> str:
+    return "0" if hash == _GENESIS_DIGEST else hash.hex()
+
+  def _view(self) -> mmap.mmap:
+    # Memory map has a fixed size. Maps the file again when blocks were appended since the last read
+    if self._mmap is None or len(self._mmap) < self._size:
+      self._file.flush()
+      self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+    return self._mmap
+
+  def _read_header(self, height : int) -> tuple:
+    timestamp_us, previous_hash, block_hash, data_len = self._HEADER.unpack_from(self._view(), self._offsets[height])
+    timestamp = _EPOCH + timedelta(microseconds=timestamp_us)
+    return timestamp, self._decode_hash(previous_hash), self._decode_hash(block_hash), data_len
+
+  def append(self, data : str):
+    """ Creates block containing the specified data and writes it to the end of the log. O(1)
+    
+    Arguments:
+        data {str} -- Data to be stored in the blockchain
+    """
+    timestamp = datetime.now(timezone.utc)
+    block_hash = calc_hash(timestamp, data, self._tail_hash)
+    encoded_data = data.encode('utf-8')
+
+    timestamp_us = (timestamp - _EPOCH) // timedelta(microseconds=1)
+    header = self._HEADER.pack(timestamp_us, self._encode_hash(self._tail_hash), self._encode_hash(block_hash), len(encoded_data))
+    self._file.write(header + encoded_data)
+
+    self._hash_index[block_hash] = len(self._offsets)
+    self._offsets.append(self._size)
+    self._size += len(header) + len(encoded_data)
+    self._tail_hash = block_hash
+
+  def data_view(self, height : int) -> memoryview:
+    """ Returns the data of a block without copying it out of the memory map.
+    
+    Arguments:
+        height {int} -- Position of the block in the chain
+    
+    Returns:
+        memoryview -- UTF-8 encoded data of the block. None if nonexistent.
+    """
+    if not 0 <= height < len(self._offsets):
+      return None
+
+    offset = self._offsets[height] + self._HEADER.size
+    data_len = self._HEADER.unpack_from(self._view(), self._offsets[height])[3]
+    return memoryview(self._view())[offset:offset + data_len]
+
+  def get_by_height(self, height : int) -> Block:
+    """ Creates the block at the provided position (0 is the head). O(1)
+        Returned blocks are not linked to each other.
+    
+    Arguments:
+        height {int} -- Position of the block in the chain
+    
+    Returns:
+        Block -- Block at the provided height. None if nonexistent.
+    """
+    if not 0 <= height < len(self._offsets):
+      return None
+
+    timestamp, previous_hash, block_hash, data_len = self._read_header(height)
+    offset = self._offsets[height] + self._HEADER.size
+    data = self._view()[offset:offset + data_len].decode('utf-8')
+    return Block.from_fields(timestamp, data, previous_hash, block_hash)
+
+  def get_by_hash(self, hash : str) -> Block:
+    """ Creates the block with the provided hash. Dictionary lookup, O(1)
+    
+    Arguments:
+        hash {str} -- Hash of the block
+    
+    Returns:
+        Block -- Block with the provided hash. None if nonexistent.
+    """
+    height = self._hash_index.get(hash)
+    return None if height is None else self.get_by_height(height)
+
+  def blocks(self, start : int = 0, stop : int = None):
+    """ Iterates over the blocks from height start up to, but not including, stop.
+    
+    Keyword Arguments:
+        start {int} -- Height of the first block (default: {0})
+        stop {int} -- Height after the last block (default: {None}, end of the chain)
+    
+    Yields:
+        Block -- Blocks in chain order
+    """
+    if stop is None or stop > len(self._offsets):
+      stop = len(self._offsets)
+    for height in range(max(start, 0), stop):
+      yield self.get_by_height(height)
+
+  def verify(self, from_index : int = None) -> bool:
+    """ Validates every block from from_index to the end of the log, recomputing their hashes.
+        By default only the blocks appended since the last successful verify() are checked. O(k)
+    
+    Keyword Arguments:
+        from_index {int} -- Index of the first block to be validated (default: {None}, last checkpoint)
+    
+    Returns:
+        bool -- True if all checked blocks are valid. Otherwise, false.
+    """
+    if from_index is None:
+      from_index = self._verified_length
+
+    if from_index < 0:
+      raise ValueError('from_index must not be negative')
+
+    # Nothing to check, as in Blockchain.verify()
+    if from_index >= len(self._offsets):
+      return True
+
+    previous_hash = "0" if from_index == 0 else self._read_header(from_index - 1)[2]
+    records = [b.hash_record() for b in self.blocks(from_index)]
+    if _verify_chunk(from_index, records, previous_hash) != -1:
+      return False
+
+    if from_index <= self._verified_length:
+      self._verified_length = len(self._offsets)
+
+    return True
+
+
 def test_block():
   # Test first block
   block1 = Block("data1", "0")
@@ -136,6 +811,343 @@ def test_blockchain(data_list : list):
     block = block.next
     index += 1
   
+def test_verify():
+  blockchain = Blockchain()
+  assert(blockchain.verify() == True)
+
+  for i in range(5):
+    blockchain.append("data{}".format(i))
+  assert(len(blockchain) == 5)
+  assert(blockchain.tail.data == "data4")
+  assert(blockchain.verified_length == 0)
+
+  assert(blockchain.verify() == True)
+  assert(blockchain.verified_length == 5)
+
+  # Only new blocks are checked after the checkpoint
+  blockchain.append("data5")
+  assert(blockchain.verify() == True)
+  assert(blockchain.verified_length == 6)
+
+  # Tampering with a block is detected by a full verification
+  blockchain.head.next._data = "tampered"
+  assert(blockchain.verify() == True)
+  assert(blockchain.verify(from_index=2) == True)
+  assert(blockchain.verify(from_index=0) == False)
+
+  try:
+    blockchain.verify(from_index=-1)
+  except ValueError:
+    pass
+  else:
+    raise ValueError("Error not raised as expected!")
+
+  print("Verification is fine!")
+
+def test_indexes():
+  blockchain = Blockchain()
+  assert(blockchain.get_by_height(0) is None)
+  assert(list(blockchain.blocks()) == [])
+
+  data_list = ["data{}".format(i) for i in range(10)]
+  for data in data_list:
+    blockchain.append(data)
+
+  block = blockchain.head
+  for height in range(len(data_list)):
+    assert(blockchain.get_by_height(height) is block)
+    assert(blockchain.get_by_hash(block.hash) is block)
+    block = block.next
+
+  assert(blockchain.get_by_height(10) is None)
+  assert(blockchain.get_by_height(-1) is None)
+  assert(blockchain.get_by_hash("0") is None)
+
+  assert([b.data for b in blockchain.blocks(3, 6)] == data_list[3:6])
+  assert([b.data for b in blockchain.blocks(8)] == data_list[8:])
+  assert([b.data for b in blockchain.blocks(5, 42)] == data_list[5:])
+
+  print("Indexes are fine!")
+
+def test_verify_parallel():
+  blockchain = Blockchain()
+  assert(blockchain.verify_parallel(workers=2) == -1)
+
+  for i in range(50):
+    blockchain.append("data{}".format(i))
+  assert(blockchain.verify_parallel(workers=2) == -1)
+  assert(blockchain.verified_length == 50)
+
+  # Invalid hash inside a chunk
+  blockchain.get_by_height(30)._data = "tampered"
+  assert(blockchain.verify_parallel(workers=2) == 30)
+
+  # Broken link on the first block of a chunk
+  blockchain.get_by_height(7)._previous_hash = "0"
+  assert(blockchain.verify_parallel(workers=3) == 7)
+
+  print("Parallel verification is fine!")
+
+def test_block_log():
+  directory = tempfile.mkdtemp()
+  path = os.path.join(directory, "chain.log")
+  try:
+    data_list = ["data{}".format(i) for i in range(10)] + ["", "dados não-ascii"]
+    with BlockLog(path) as log:
+      assert(len(log) == 0)
+      assert(log.get_by_height(0) is None)
+      assert(log.data_view(0) is None)
+      assert(log.verify(from_index=5) == True)
+      for data in data_list:
+        log.append(data)
+      assert(log.verify() == True)
+      hashes = [b.hash for b in log.blocks()]
+
+    # Reopened log holds the same blocks
+    with BlockLog(path) as log:
+      assert(len(log) == len(data_list))
+      assert([b.data for b in log.blocks()] == data_list)
+      assert([b.hash for b in log.blocks()] == hashes)
+      assert(log.get_by_height(0).previous_hash == "0")
+      assert(log.get_by_hash(hashes[3]).data == "data3")
+      assert(log.get_by_hash("0") is None)
+      assert(bytes(log.data_view(5)) == b"data5")
+      assert(log.data_view(len(data_list)) is None)
+      assert(log.verify(from_index=len(data_list) + 5) == True)
+      assert(log.verify() == True)
+
+      # Appending after reopening continues the chain
+      log.append("data12")
+      assert(log.get_by_height(12).previous_hash == hashes[-1])
+      assert(log.verify() == True)
+
+    # Partially written record is discarded
+    with open(path, "ab") as f:
+      f.write(b"partial")
+    with BlockLog(path) as log:
+      assert(len(log) == len(data_list) + 1)
+      assert(log.verify(from_index=0) == True)
+
+    # Tampered data is detected
+    with open(path, "r+b") as f:
+      f.seek(BlockLog._HEADER.size)
+      f.write(b"X")
+    with BlockLog(path) as log:
+      assert(log.get_by_height(0).data == "Xata0")
+      assert(log.verify() == False)
+  finally:
+    shutil.rmtree(directory)
+
+  print("Block log is fine!")
+
+def test_batch():
+  # Every batch size from a single record to an odd number of leaves on several levels
+  for size in [1, 2, 3, 4, 5, 8, 13]:
+    records = ["record{}".format(i) for i in range(size)]
+    block = BatchBlock(records, "0")
+    assert(block.data == merkle_root(records))
+    for index, record in enumerate(records):
+      proof = block.proof(index)
+      assert(len(proof) <= (size - 1).bit_length())
+      assert(verify_merkle_proof(record, proof, block.data) == True)
+      assert(verify_merkle_proof("other", proof, block.data) == False)
+
+  try:
+    BatchBlock([], "0")
+  except ValueError:
+    pass
+  else:
+    raise ValueError("Error not raised as expected!")
+
+  blockchain = Blockchain()
+  blockchain.append("data")
+  blockchain.append_batch(["a", "b", "c"])
+  assert(blockchain.tail.previous_hash == blockchain.head.hash)
+  assert(blockchain.tail.records == ("a", "b", "c"))
+  assert(blockchain.verify() == True)
+
+  assert(blockchain.verify_parallel(workers=2) == -1)
+
+  # Tampered record no longer matches the Merkle root
+  blockchain.tail._records = ("a", "x", "c")
+  assert(blockchain.verify(from_index=0) == False)
+  assert(blockchain.verify_parallel(workers=2) == 1)
+
+  # Repeating the last record changes the Merkle root
+  assert(merkle_root(["a", "b", "c"]) != merkle_root(["a", "b", "c", "c"]))
+  blockchain = Blockchain()
+  blockchain.append_batch(["a", "b", "c"])
+  blockchain.tail._records += ("c",)
+  assert(blockchain.verify(from_index=0) == False)
+  assert(blockchain.verify_parallel(workers=2) == 0)
+
+  # Flush by number of records
+  blockchain = Blockchain()
+  with BatchWriter(blockchain, max_records=4) as writer:
+    for i in range(10):
+      writer.add(str(i))
+    assert(len(blockchain) == 2)
+    assert(len(writer) == 2)
+  assert([b.records for b in blockchain.blocks()] == [("0", "1", "2", "3"), ("4", "5", "6", "7"), ("8", "9")])
+
+  # Flush by time
+  blockchain = Blockchain()
+  writer = BatchWriter(blockchain, max_records=100, max_delay=0)
+  writer.add("0")
+  writer.add("1")
+  assert(len(blockchain) == 2)
+
+  # Flush by time without further records
+  blockchain = Blockchain()
+  writer = BatchWriter(blockchain, max_records=100, max_delay=0.05)
+  assert(writer.poll() == False)
+  writer.add("0")
+  assert(writer.poll() == False)
+  time.sleep(0.06)
+  assert(writer.poll() == True)
+  assert(len(blockchain) == 1)
+  assert(len(writer) == 0)
+
+  print("Batches are fine!")
+
+def test_compact_block():
+  block1 = CompactBlock("data1", "0")
+  assert(block1.data == "data1")
+  assert(type(block1.timestamp) == datetime)
+  assert(block1.previous_hash == "0")
+  assert(len(block1.digest) == 32)
+  assert(block1.hash == block1.calc_hash())
+
+  block2 = CompactBlock("data1", block1.hash)
+  assert(block2.previous_hash == block1.hash)
+  assert(block2.previous_digest == block1.digest)
+
+  # Nanosecond timestamps keep blocks with the same data apart
+  block3 = CompactBlock("data1", "0")
+  if block3.timestamp_ns != block1.timestamp_ns:
+    assert(block3.hash != block1.hash)
+
+  blockchain = Blockchain(CompactBlock)
+  for i in range(20):
+    blockchain.append("data{}".format(i))
+  blockchain.append_batch(["a", "b"])
+  assert([b.data for b in blockchain.blocks(0, 3)] == ["data0", "data1", "data2"])
+  assert(blockchain.get_by_hash(blockchain.get_by_height(5).hash).data == "data5")
+  assert(blockchain.get_by_hash(blockchain.tail.hash) is blockchain.tail)
+  assert(blockchain.get_by_hash("0") is None)
+  assert(blockchain.verify() == True)
+  assert(blockchain.verify_parallel(workers=2) == -1)
+
+  blockchain.get_by_height(12)._data = b"tampered"
+  assert(blockchain.verify(from_index=0) == False)
+  assert(blockchain.verify_parallel(workers=2) == 12)
+
+  print("Compact blocks are fine!")
+
+def benchmark_append(sizes : tuple = (1000, 10000, 100000, 1000000)):
+  # Measures ingest throughput of append() followed by a single verify()
+  for size in sizes:
+    blockchain = Blockchain()
+
+    start = time.perf_counter()
+    for i in range(size):
+      blockchain.append(str(i))
+    append_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    assert(blockchain.verify())
+    verify_time = time.perf_counter() - start
+
+    print("{:>8} blocks: append {:>10.0f} blocks/s, verify {:>10.0f} blocks/s".format(
+      size, size / append_time, size / verify_time))
+
+def benchmark_verify_parallel(size : int = 200000, workers : tuple = (1, 2, 4, 8)):
+  # Compares serial verify() against verify_parallel() with increasing number of workers
+  blockchain = Blockchain()
+  for i in range(size):
+    blockchain.append(str(i))
+
+  start = time.perf_counter()
+  assert(blockchain.verify(from_index=0))
+  serial_time = time.perf_counter() - start
+  print("{:>8} blocks: serial     {:>8.3f}s".format(size, serial_time))
+
+  for count in workers:
+    start = time.perf_counter()
+    assert(blockchain.verify_parallel(workers=count) == -1)
+    parallel_time = time.perf_counter() - start
+    print("{:>8} blocks: {:>2} workers {:>8.3f}s ({:.2f}x)".format(
+      size, count, parallel_time, serial_time / parallel_time))
+
+def benchmark_block_log(sizes : tuple = (1000, 10000, 100000, 1000000)):
+  # Measures append throughput and time needed to reopen a log
+  directory = tempfile.mkdtemp()
+  try:
+    for size in sizes:
+      path = os.path.join(directory, "chain_{}.log".format(size))
+
+      start = time.perf_counter()
+      with BlockLog(path) as log:
+        for i in range(size):
+          log.append(str(i))
+      append_time = time.perf_counter() - start
+
+      start = time.perf_counter()
+      with BlockLog(path) as log:
+        open_time = time.perf_counter() - start
+        start = time.perf_counter()
+        log.get_by_height(size // 2)
+        read_time = time.perf_counter() - start
+
+      print("{:>8} blocks: append {:>10.0f} blocks/s, reopen {:>8.3f}s, read {:>8.6f}s, {:>6.1f} bytes/block".format(
+        size, size / append_time, open_time, read_time, os.path.getsize(path) / size))
+      os.remove(path)
+  finally:
+    shutil.rmtree(directory)
+
+def benchmark_batch(size : int = 100000, batch_sizes : tuple = (10, 100, 1000, 10000)):
+  # Compares records/s of one block per record against BatchWriter with increasing batch sizes
+  records = [str(i) for i in range(size)]
+
+  blockchain = Blockchain()
+  start = time.perf_counter()
+  for record in records:
+    blockchain.append(record)
+  single_time = time.perf_counter() - start
+  print("{:>8} records: 1 per block     {:>10.0f} records/s".format(size, size / single_time))
+
+  for batch_size in batch_sizes:
+    blockchain = Blockchain()
+    start = time.perf_counter()
+    with BatchWriter(blockchain, max_records=batch_size) as writer:
+      for record in records:
+        writer.add(record)
+    batch_time = time.perf_counter() - start
+    print("{:>8} records: {:>5} per block {:>10.0f} records/s ({:.2f}x)".format(
+      size, batch_size, size / batch_time, single_time / batch_time))
+
+def benchmark_compact_block(size : int = 100000):
+  # Compares memory per block and blocks/s of Block and CompactBlock chains.
+  # tracemalloc slows down every allocation, so memory is measured in a separate, untimed pass
+  for block_class in [Block, CompactBlock]:
+    start = time.perf_counter()
+    blockchain = Blockchain(block_class)
+    for i in range(size):
+      blockchain.append(str(i))
+    elapsed = time.perf_counter() - start
+    del blockchain
+
+    tracemalloc.start()
+    blockchain = Blockchain(block_class)
+    for i in range(size):
+      blockchain.append(str(i))
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del blockchain
+
+    print("{:>8} blocks: {:<12} {:>10.0f} blocks/s, {:>6.0f} bytes/block".format(
+      size, block_class.__name__, size / elapsed, memory / size))
+
 
 if __name__ == "__main__":
   test_block()
@@ -150,4 +1162,17 @@ if __name__ == "__main__":
   print("\nTesting 10 blocks in chain")
   test_blockchain(["data1", "data2", "data3", "data4", "data5", "data6", "data7", "data8", "data9", "data10"])
   print("\nBlockchain is fine")
+  test_verify()
+  test_indexes()
+  test_verify_parallel()
+  test_block_log()
+  test_batch()
+  test_compact_block()
+
+  if "--benchmark" in sys.argv:
+    benchmark_append()
+    benchmark_verify_parallel()
+    benchmark_block_log()
+    benchmark_batch()
+    benchmark_compact_block()
 
@@ -1,3 +1,22 @@
+import sys
+import time
+import tracemalloc
+
+from array import array
+
+import tracing
+
+try:
+    import numpy
+except ImportError:
+    numpy = None # Bitmap operations fall back to pure Python
+
+# Size ratio above which sorted_intersection() gallops through the longer list
+GALLOP_RATIO = 32
+
+# Largest value range (max - min + 1) accepted by bitmap_union() and bitmap_intersection()
+BITMAP_MAX_SPAN = 1 << 27
+
 class Node:
     def __init__(self, value):
         self.value = value
@@ -10,36 +29,97 @@ class Node:
 class LinkedList:
     def __init__(self):
         self.head = None
+        self.tail = None
+        self._size = 0
 
     def __str__(self):
-        cur_head = self.head
-        out_string = ""
-        while cur_head:
-            out_string += str(cur_head.value) + " -> "
-            cur_head = cur_head.next
-        return out_string
+        return "".join(str(value) + " -> " for value in self)
 
+    def __iter__(self):
+        node = self.head
+        while node:
+            yield node.value
+            node = node.next
 
     def append(self, value):
-
+        """ Appends value to the end of the list using the tail pointer. O(1)
+        """
         if self.head is None:
             self.head = Node(value)
-            return
-
-        node = self.head
-        while node.next:
-            node = node.next
+            self.tail = self.head
+        else:
+            self.tail.next = Node(value)
+            self.tail = self.tail.next
 
-        node.next = Node(value)
+        self._size += 1
 
     def size(self):
-        size = 0
-        node = self.head
-        while node:
-            size += 1
-            node = node.next
+        return self._size
+
+class _ArrayNode:
+    """ Node-like view of a position in an ArrayLinkedList. Created only when head/tail/next are read.
+    """
+    __slots__ = ("_llist", "_index")
+
+    def __init__(self, llist : 'ArrayLinkedList', index : int):
+        self._llist = llist
+        self._index = index
+
+    @property
+    def value(self) -> int:
+        return self._llist._values[self._index]
+
+    @property
+    def next(self) -> '_ArrayNode':
+        if self._index + 1 < len(self._llist._values):
+            return _ArrayNode(self._llist, self._index + 1)
+        return None
+
+    def __repr__(self):
+        return str(self.value)
+
+class ArrayLinkedList:
+    """ LinkedList of 64-bit integers stored in a contiguous array('q'), 8 bytes per element.
+        Since elements can only be appended, the link of each element is implicitly the next index.
+        head, tail and Node.next are provided through lightweight views for existing callers,
+        but iterating or using the buffer directly is much faster.
+    """
+    def __init__(self):
+        self._values = array('q')
+
+    def __str__(self):
+        return "".join(str(value) + " -> " for value in self._values)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def head(self) -> _ArrayNode:
+        return _ArrayNode(self, 0) if self._values else None
+
+    @property
+    def tail(self) -> _ArrayNode:
+        return _ArrayNode(self, len(self._values) - 1) if self._values else None
 
-        return size
+    @property
+    def values(self) -> array:
+        return self._values
+
+    def append(self, value : int):
+        """ Appends value to the end of the list. Amortized O(1)
+        """
+        self._values.append(value)
+
+    def extend(self, values):
+        """ Appends all values to the end of the list. O(k)
+        """
+        self._values.extend(values)
+
+    def size(self):
+        return len(self._values)
 
 def list_to_set(llist : LinkedList) -> set:
     """ Converts a LinkedList into a set.
@@ -50,19 +130,15 @@ def list_to_set(llist : LinkedList) -> set:
     Returns:
         set -- Set containing all elements of llist
     """
-    current_node = llist.head
-    lset = set()
-    while current_node is not None:
-        lset.add(current_node.value)
-        current_node = current_node.next
-    
-    return lset
+    return set(llist)
 
 
+@tracing.traced("set.union")
 def union(llist_1 : LinkedList, llist_2 : LinkedList) -> LinkedList:
     """ Uses sets to generate a LinkedList containing the union of llist_1 and llist_2
+        Elements keep the order in which they first appear in llist_1 and then in llist_2
 
-        Time complexity is defined by the for loops, which depends on the size of both sets. 
+        Each element is visited once, and both set lookups and appends are O(1).
         O(n), where n is len(llist_1) + len(llist_2)
 
         Space complexity scales linearly with the size of the lists: O(n)
@@ -74,27 +150,23 @@ def union(llist_1 : LinkedList, llist_2 : LinkedList) -> LinkedList:
     Returns:
         LinkedList -- LinkedList containing the union of inputs
     """
-    # Convert to set to remove repeated entries in each list
-    lset_1 = list_to_set(llist_1)
-    lset_2 = list_to_set(llist_2)
-    
-    # Combine the two sets to create a union
+    # Set of added items removes repeated entries from both lists
     union_list = LinkedList()
-    list_of_added = []
-    for item in lset_1:
-        union_list.append(item)
-        list_of_added.append(item)
-
-    for item in lset_2:
-        if item not in list_of_added:
-            union_list.append(item)
+    set_of_added = set()
+    for llist in (llist_1, llist_2):
+        for item in llist:
+            if item not in set_of_added:
+                union_list.append(item)
+                set_of_added.add(item)
 
     return union_list
 
+@tracing.traced("set.intersection")
 def intersection(llist_1 : LinkedList, llist_2 : LinkedList) -> LinkedList:
     """ Uses sets to generate a LinkedList containing the intersection of llist_1 and llist_2
+        Elements keep the order in which they first appear in llist_1
 
-        Time complexity is defined by the for loops, which depends on the size of both sets. 
+        Each element is visited once, and both set lookups and appends are O(1).
         O(n), where n is len(llist_1) + len(llist_2)
 
         Space complexity scales linearly with the size of the lists: O(n)
@@ -106,25 +178,395 @@ def intersection(llist_1 : LinkedList, llist_2 : LinkedList) -> LinkedList:
     Returns:
         LinkedList -- LinkedList containing the intersection of inputs
     """
-    # Convert to set to remove repeated entries in each list
-    lset_1 = list_to_set(llist_1)
-    lset_2 = list_to_set(llist_2)
+    # Convert to set to allow O(1) lookups
+    set_of_candidates = list_to_set(llist_2)
 
     # Initialize empty intersec_list
     intersec_list = LinkedList()
-    
-    # Populate list_of_candidates with all elements from lset_1
-    list_of_candidates = []
-    for item in lset_1:
-        list_of_candidates.append(item)
-
-    # Only add to intersec_list the items from lset_2 available in list_of_candidates
-    for item in lset_2:
-        if item in list_of_candidates:
+
+    # Only add to intersec_list the items from llist_1 available in set_of_candidates.
+    # Candidates are removed once added, so repeated entries are ignored
+    for item in llist_1:
+        if item in set_of_candidates:
             intersec_list.append(item)
+            set_of_candidates.remove(item)
+
+    return intersec_list
+
+def is_sorted(llist : LinkedList) -> bool:
+    """ Returns whether the values of llist are in non-decreasing order. O(n)
+    
+    Arguments:
+        llist {LinkedList} -- LinkedList object
+    
+    Returns:
+        bool -- True if llist is sorted. Otherwise, false.
+    """
+    node = llist.head
+    while node is not None and node.next is not None:
+        if node.next.value < node.value:
+            return False
+        node = node.next
+    return True
+
+def _check_sorted(check_sorted : bool, *llists):
+    if check_sorted:
+        for llist in llists:
+            if not is_sorted(llist):
+                raise ValueError('LinkedList is not sorted')
+
+@tracing.traced("set.sorted_union")
+def sorted_union(llist_1 : LinkedList, llist_2 : LinkedList, check_sorted : bool = True) -> LinkedList:
+    """ Merges two sorted LinkedLists into a sorted LinkedList without repeated entries.
+        Single pass over both lists. Time complexity of O(n), where n is len(llist_1) + len(llist_2)
+        Apart from the result, space complexity is O(1)
+
+    Arguments:
+        llist_1 {LinkedList} -- Sorted LinkedList object
+        llist_2 {LinkedList} -- Sorted LinkedList object
+
+    Keyword Arguments:
+        check_sorted {bool} -- Verify that inputs are sorted. Set to False when sortedness is known (default: {True})
+
+    Raises:
+        ValueError: Error raised if check_sorted is set and an input is not sorted
+
+    Returns:
+        LinkedList -- Sorted LinkedList containing the union of inputs
+    """
+    _check_sorted(check_sorted, llist_1, llist_2)
+
+    union_list = LinkedList()
+    node_1 = llist_1.head
+    node_2 = llist_2.head
+    while node_1 is not None or node_2 is not None:
+        # Takes the smallest value available in either list
+        if node_2 is None or (node_1 is not None and node_1.value <= node_2.value):
+            value = node_1.value
+            node_1 = node_1.next
+        else:
+            value = node_2.value
+            node_2 = node_2.next
+
+        # Repeated entries are always next to each other
+        if union_list.tail is None or union_list.tail.value != value:
+            union_list.append(value)
+
+    return union_list
+
+@tracing.traced("set.sorted_intersection")
+def sorted_intersection(llist_1 : LinkedList, llist_2 : LinkedList, check_sorted : bool = True) -> LinkedList:
+    """ Intersects two sorted LinkedLists into a sorted LinkedList without repeated entries.
+        Single pass over both lists. Time complexity of O(n), where n is len(llist_1) + len(llist_2)
+        Apart from the result, space complexity is O(1)
+        When one list is more than GALLOP_RATIO times longer than the other galloping_intersection() is used
+
+    Arguments:
+        llist_1 {LinkedList} -- Sorted LinkedList object
+        llist_2 {LinkedList} -- Sorted LinkedList object
+
+    Keyword Arguments:
+        check_sorted {bool} -- Verify that inputs are sorted. Set to False when sortedness is known (default: {True})
+
+    Raises:
+        ValueError: Error raised if check_sorted is set and an input is not sorted
+
+    Returns:
+        LinkedList -- Sorted LinkedList containing the intersection of inputs
+    """
+    _check_sorted(check_sorted, llist_1, llist_2)
+
+    small_size = min(llist_1.size(), llist_2.size())
+    large_size = max(llist_1.size(), llist_2.size())
+    if large_size > small_size * GALLOP_RATIO:
+        return galloping_intersection(llist_1, llist_2, check_sorted=False)
+
+    intersec_list = LinkedList()
+    node_1 = llist_1.head
+    node_2 = llist_2.head
+    while node_1 is not None and node_2 is not None:
+        # Advances the list holding the smallest value
+        if node_1.value < node_2.value:
+            node_1 = node_1.next
+        elif node_2.value < node_1.value:
+            node_2 = node_2.next
+        else:
+            if intersec_list.tail is None or intersec_list.tail.value != node_1.value:
+                intersec_list.append(node_1.value)
+            node_1 = node_1.next
+            node_2 = node_2.next
+
+    return intersec_list
+
+def _gallop(node : Node, value) -> Node:
+    """ Returns the first node after node holding a value not smaller than value. None if nonexistent.
+        Expects node.value < value. Probes nodes 1, 2, 4, ... positions ahead and then binary
+        searches the last interval, so only O(log(k)) values are compared, where k is the
+        distance to the returned node. Following the links still takes O(k), since a
+        linked list has no random access.
+    """
+    step = 1
+    while True:
+        probe = node
+        hops = 0
+        while hops < step and probe.next is not None:
+            probe = probe.next
+            hops += 1
+
+        if probe.value >= value:
+            break
+        if probe.next is None:
+            return None
+
+        node = probe
+        step *= 2
+
+    # Binary search over the `hops` nodes after node. The last one (probe) is known to match
+    while hops > 1:
+        half = hops // 2
+        middle = node
+        for _ in range(half):
+            middle = middle.next
+
+        if middle.value >= value:
+            hops = half
+        else:
+            node = middle
+            hops -= half
+
+    return node.next
+
+@tracing.traced("set.galloping_intersection")
+def galloping_intersection(llist_1 : LinkedList, llist_2 : LinkedList, check_sorted : bool = True) -> LinkedList:
+    """ Intersects two sorted LinkedLists of very different sizes.
+        Walks the shorter list and gallops (exponential search) through the longer one.
+        Compares O(m*log(n/m)) values, where m and n are the sizes of the shorter and longer lists.
+        Apart from the result, space complexity is O(1)
+
+    Arguments:
+        llist_1 {LinkedList} -- Sorted LinkedList object
+        llist_2 {LinkedList} -- Sorted LinkedList object
+
+    Keyword Arguments:
+        check_sorted {bool} -- Verify that inputs are sorted. Set to False when sortedness is known (default: {True})
+
+    Raises:
+        ValueError: Error raised if check_sorted is set and an input is not sorted
+
+    Returns:
+        LinkedList -- Sorted LinkedList containing the intersection of inputs
+    """
+    _check_sorted(check_sorted, llist_1, llist_2)
+
+    if llist_1.size() > llist_2.size():
+        llist_1, llist_2 = llist_2, llist_1
+
+    intersec_list = LinkedList()
+    large_node = llist_2.head
+    small_node = llist_1.head
+    while small_node is not None and large_node is not None:
+        value = small_node.value
+        if large_node.value < value:
+            large_node = _gallop(large_node, value)
+            if large_node is None:
+                break
+
+        if large_node.value == value and (intersec_list.tail is None or intersec_list.tail.value != value):
+            intersec_list.append(value)
+        small_node = small_node.next
 
     return intersec_list
 
+def _size_hint(iterable) -> float:
+    # Inputs of unknown size, like generators, are treated as the largest
+    if isinstance(iterable, LinkedList):
+        return iterable.size()
+    try:
+        return len(iterable)
+    except TypeError:
+        return float("inf")
+
+def union_all(*iterables):
+    """ Lazily yields the union of any number of iterables (LinkedLists, lists, generators...)
+        Elements are yielded as soon as they are first seen, in input order.
+        Time complexity of O(n), where n is the total number of elements.
+        Space complexity is O(u), where u is the number of distinct elements
+
+    Arguments:
+        *iterables -- Inputs to be combined
+
+    Yields:
+        Elements present in any of the inputs, without repeated entries
+    """
+    set_of_added = set()
+    for iterable in iterables:
+        for item in iterable:
+            if item not in set_of_added:
+                set_of_added.add(item)
+                yield item
+
+def intersect_all(*iterables):
+    """ Lazily yields the intersection of any number of iterables (LinkedLists, lists, generators...)
+        Inputs are processed from the smallest to the largest, so the set of candidates
+        never grows beyond the smallest input. Inputs of unknown size go last.
+        Processing stops as soon as no candidates are left, leaving remaining inputs unconsumed.
+        The largest input is streamed, so elements are yielded in its order as they are found.
+        Time complexity of O(n), where n is the total number of elements.
+        Space complexity is O(m), where m is the size of the smallest input
+
+    Arguments:
+        *iterables -- Inputs to be intersected
+
+    Yields:
+        Elements present in every input, without repeated entries
+    """
+    if len(iterables) == 0:
+        return
+
+    if len(iterables) == 1:
+        # Yields the single input without repeated entries, in its own order.
+        # Handled first, since building candidates would consume a generator
+        yield from union_all(iterables[0])
+        return
+
+    ordered = sorted(iterables, key=_size_hint) # sorted is stable, so ties keep input order
+
+    set_of_candidates = set(ordered[0])
+    for iterable in ordered[1:-1]:
+        if not set_of_candidates:
+            return
+        set_of_candidates = {item for item in iterable if item in set_of_candidates}
+
+    if not set_of_candidates:
+        return
+
+    for item in ordered[-1]:
+        if item in set_of_candidates:
+            set_of_candidates.remove(item)
+            yield item
+            if not set_of_candidates:
+                return
+
+def _bitmap_values(llist):
+    # ArrayLinkedList buffers are shared with numpy without copying
+    if isinstance(llist, ArrayLinkedList):
+        return numpy.frombuffer(llist.values, dtype=numpy.int64)
+    return numpy.fromiter(llist, dtype=numpy.int64)
+
+# Results are stored in an ArrayLinkedList, so values must fit in 64 bits
+_INT64_MIN = -(1 << 63)
+_INT64_MAX = (1 << 63) - 1
+
+def _bitmap_bounds(llist_1, llist_2, max_span : int) -> tuple:
+    # Validates that all values are 64-bit integers within a range small enough for a bitmap
+    values = []
+    for llist in (llist_1, llist_2):
+        if llist.head is None:
+            continue
+        # ArrayLinkedList can only hold such values. Otherwise, the type of every value is checked
+        if not isinstance(llist, ArrayLinkedList) and not all(issubclass(value_type, int) for value_type in set(map(type, llist))):
+            raise ValueError('Bitmap operations only support integer values')
+        values += [min(llist), max(llist)]
+
+    if not values:
+        return 0, 0
+
+    low = min(values)
+    high = max(values)
+    if low < _INT64_MIN or high > _INT64_MAX:
+        raise ValueError('Bitmap operations only support 64-bit integer values')
+    span = high - low + 1
+    if span > max_span:
+        raise ValueError('Range of values is too large for a bitmap')
+    return low, span
+
+def _bitmap(llist, low : int, span : int):
+    # One entry per possible value. Uses numpy when available
+    if numpy is not None:
+        bitmap = numpy.zeros(span, dtype=bool)
+        bitmap[_bitmap_values(llist) - low] = True
+        return bitmap
+
+    bitmap = bytearray(span)
+    for value in llist:
+        bitmap[value - low] = 1
+    return bitmap
+
+def _combine_bitmaps(bitmap_1, bitmap_2, is_union : bool):
+    if numpy is not None:
+        return bitmap_1 | bitmap_2 if is_union else bitmap_1 & bitmap_2
+
+    # Bytes are 0 or 1, so combining them as big integers works bytewise in C
+    int_1 = int.from_bytes(bitmap_1, 'little')
+    int_2 = int.from_bytes(bitmap_2, 'little')
+    combined = int_1 | int_2 if is_union else int_1 & int_2
+    return bytearray(combined.to_bytes(len(bitmap_1), 'little'))
+
+def _bitmap_to_list(bitmap, low : int) -> ArrayLinkedList:
+    result = ArrayLinkedList()
+    if numpy is not None:
+        result.values.frombytes((numpy.flatnonzero(bitmap) + low).astype(numpy.int64).tobytes())
+        return result
+
+    # bytearray.find() skips runs of absent values in C
+    index = bitmap.find(1)
+    while index != -1:
+        result.append(index + low)
+        index = bitmap.find(1, index + 1)
+    return result
+
+@tracing.traced("set.bitmap_union")
+def bitmap_union(llist_1, llist_2, max_span : int = BITMAP_MAX_SPAN) -> ArrayLinkedList:
+    """ Union of two lists of integers using a bitmap over their range of values.
+        Values are returned in ascending order, without repeated entries.
+        Time complexity of O(n + r) and space complexity of O(r), where r is the range of values.
+        Uses numpy when it is installed
+
+    Arguments:
+        llist_1 {LinkedList} -- LinkedList or ArrayLinkedList of integers
+        llist_2 {LinkedList} -- LinkedList or ArrayLinkedList of integers
+
+    Keyword Arguments:
+        max_span {int} -- Largest accepted range of values (default: {BITMAP_MAX_SPAN})
+
+    Raises:
+        ValueError: Error raised if values are not 64-bit integers or their range exceeds max_span
+
+    Returns:
+        ArrayLinkedList -- ArrayLinkedList containing the union of inputs
+    """
+    low, span = _bitmap_bounds(llist_1, llist_2, max_span)
+    bitmap_1 = _bitmap(llist_1, low, span)
+    bitmap_2 = _bitmap(llist_2, low, span)
+
+    return _bitmap_to_list(_combine_bitmaps(bitmap_1, bitmap_2, True), low)
+
+@tracing.traced("set.bitmap_intersection")
+def bitmap_intersection(llist_1, llist_2, max_span : int = BITMAP_MAX_SPAN) -> ArrayLinkedList:
+    """ Intersection of two lists of integers using a bitmap over their range of values.
+        Values are returned in ascending order, without repeated entries.
+        Time complexity of O(n + r) and space complexity of O(r), where r is the range of values.
+        Uses numpy when it is installed
+
+    Arguments:
+        llist_1 {LinkedList} -- LinkedList or ArrayLinkedList of integers
+        llist_2 {LinkedList} -- LinkedList or ArrayLinkedList of integers
+
+    Keyword Arguments:
+        max_span {int} -- Largest accepted range of values (default: {BITMAP_MAX_SPAN})
+
+    Raises:
+        ValueError: Error raised if values are not 64-bit integers or their range exceeds max_span
+
+    Returns:
+        ArrayLinkedList -- ArrayLinkedList containing the intersection of inputs
+    """
+    low, span = _bitmap_bounds(llist_1, llist_2, max_span)
+    bitmap_1 = _bitmap(llist_1, low, span)
+    bitmap_2 = _bitmap(llist_2, low, span)
+
+    return _bitmap_to_list(_combine_bitmaps(bitmap_1, bitmap_2, False), low)
+
 def test_edge_cases():
     pass
 
@@ -161,9 +603,299 @@ def test_standard_lists(element_1 : list, element_2 : list):
             assert(node.value in element_1 and node.value in element_2)
             node = node.next
 
+
+def test_ordering():
+
+    linked_list_1 = LinkedList()
+    linked_list_2 = LinkedList()
+    for i in [3, 2, 4, 35, 6, 65, 6, 4, 3, 21]:
+        linked_list_1.append(i)
+    for i in [6, 32, 4, 9, 6, 1, 11, 21, 1]:
+        linked_list_2.append(i)
+
+    assert(linked_list_1.size() == 10)
+    assert(linked_list_1.tail.value == 21)
+
+    # Results follow the order of first appearance
+    assert(list(union(linked_list_1, linked_list_2)) == [3, 2, 4, 35, 6, 65, 21, 32, 9, 1, 11])
+    assert(list(intersection(linked_list_1, linked_list_2)) == [4, 6, 21])
+    assert(union(linked_list_1, linked_list_2).size() == 11)
+
+    empty_list = LinkedList()
+    assert(empty_list.size() == 0)
+    assert(list(union(empty_list, linked_list_2)) == [6, 32, 4, 9, 1, 11, 21])
+    assert(intersection(linked_list_1, empty_list).size() == 0)
+
+def test_sorted_lists():
+
+    def to_linked_list(elements : list) -> LinkedList:
+        llist = LinkedList()
+        for i in elements:
+            llist.append(i)
+        return llist
+
+    element_1 = [1, 2, 2, 4, 6, 6, 21, 35, 65]
+    element_2 = [1, 1, 4, 6, 9, 11, 21, 32]
+    linked_list_1 = to_linked_list(element_1)
+    linked_list_2 = to_linked_list(element_2)
+
+    assert(is_sorted(linked_list_1) == True)
+    assert(is_sorted(to_linked_list([3, 2])) == False)
+    assert(is_sorted(LinkedList()) == True)
+
+    expected_union = sorted(set(element_1) | set(element_2))
+    expected_intersec = sorted(set(element_1) & set(element_2))
+    assert(list(sorted_union(linked_list_1, linked_list_2)) == expected_union)
+    assert(list(sorted_intersection(linked_list_1, linked_list_2)) == expected_intersec)
+    assert(list(galloping_intersection(linked_list_1, linked_list_2)) == expected_intersec)
+    assert(list(galloping_intersection(linked_list_2, linked_list_1)) == expected_intersec)
+
+    assert(list(sorted_union(LinkedList(), linked_list_2)) == sorted(set(element_2)))
+    assert(sorted_intersection(LinkedList(), linked_list_2).size() == 0)
+    assert(galloping_intersection(linked_list_1, LinkedList()).size() == 0)
+
+    # Very unequal sizes switch to galloping
+    large_elements = list(range(0, 10000, 3))
+    small_elements = [-5, 0, 0, 7, 9, 999, 5000, 9999, 20000]
+    expected_intersec = sorted(set(large_elements) & set(small_elements))
+    large_list = to_linked_list(large_elements)
+    small_list = to_linked_list(small_elements)
+    assert(list(sorted_intersection(small_list, large_list)) == expected_intersec)
+    assert(list(sorted_intersection(large_list, small_list, check_sorted=False)) == expected_intersec)
+
+    try:
+        sorted_union(to_linked_list([3, 2]), linked_list_2)
+    except ValueError:
+        pass
+    else:
+        raise ValueError("Error not raised as expected!")
+
+def test_streaming():
+
+    linked_list = LinkedList()
+    for i in [3, 2, 4, 35, 6, 65, 6, 4, 3, 21]:
+        linked_list.append(i)
+
+    assert(list(union_all()) == [])
+    assert(list(intersect_all()) == [])
+    assert(list(union_all(linked_list, [6, 32, 4], (i for i in [1, 32, 100]))) == [3, 2, 4, 35, 6, 65, 21, 32, 1, 100])
+    assert(list(intersect_all(linked_list)) == [3, 2, 4, 35, 6, 65, 21])
+    assert(list(intersect_all(iter([1, 2, 2, 3]))) == [1, 2, 3])
+    assert(list(intersect_all(linked_list, [6, 32, 4, 21, 6], (i for i in [21, 4, 5, 6, 4]))) == [21, 4, 6])
+
+    # Smallest input is processed first and an empty candidate set stops consuming streams
+    consumed = []
+    def stream():
+        for i in range(1000):
+            consumed.append(i)
+            yield i
+    assert(list(intersect_all(stream(), [42], [7])) == [])
+    assert(consumed == [])
+
+    # Largest input stops being consumed once every candidate was found
+    consumed.clear()
+    assert(list(intersect_all([1, 2], stream())) == [1, 2])
+    assert(consumed == [0, 1, 2])
+
+    result = intersect_all([1, 2], linked_list, stream())
+    assert(next(result) == 2)
+
+def test_array_list():
+
+    array_list = ArrayLinkedList()
+    assert(array_list.head is None)
+    assert(array_list.size() == 0)
+    assert(str(array_list) == "")
+
+    for i in [3, 2, 4, 35, 6, 65, 6, 4, 3, 21]:
+        array_list.append(i)
+    linked_list = LinkedList()
+    for i in [6, 32, 4, 9, 6, 1, 11, 21, 1]:
+        linked_list.append(i)
+
+    # Same interface as LinkedList
+    assert(array_list.size() == 10)
+    assert(array_list.tail.value == 21)
+    assert(array_list.head.next.value == 2)
+    assert(str(array_list) == "3 -> 2 -> 4 -> 35 -> 6 -> 65 -> 6 -> 4 -> 3 -> 21 -> ")
+    assert(list(union(array_list, linked_list)) == [3, 2, 4, 35, 6, 65, 21, 32, 9, 1, 11])
+    assert(list(intersection(array_list, linked_list)) == [4, 6, 21])
+    assert(is_sorted(array_list) == False)
+
+    # Bitmap operations return sorted values
+    assert(list(bitmap_union(array_list, linked_list)) == sorted(set(array_list) | set(linked_list)))
+    assert(list(bitmap_intersection(array_list, linked_list)) == [4, 6, 21])
+    assert(list(bitmap_union(ArrayLinkedList(), LinkedList())) == [])
+    assert(list(bitmap_intersection(array_list, ArrayLinkedList())) == [])
+
+    negative_list = ArrayLinkedList()
+    negative_list.extend([-10, 4, 100])
+    assert(list(bitmap_intersection(negative_list, array_list)) == [4])
+    assert(list(bitmap_union(negative_list, linked_list))[:3] == [-10, 1, 4])
+    negative_list.append(2 ** 40)
+
+    string_list = LinkedList()
+    string_list.append("a")
+
+    mixed_list = LinkedList()
+    for value in [1, 2.5, 3]:
+        mixed_list.append(value)
+
+    huge_list = LinkedList()
+    for value in [2 ** 63, 2 ** 63 + 1]:
+        huge_list.append(value)
+
+    # Range too large, values that are not integers or don't fit in 64 bits
+    for invalid_list in [negative_list, string_list, mixed_list, huge_list]:
+        for operation in [bitmap_union, bitmap_intersection]:
+            try:
+                operation(invalid_list, linked_list)
+            except ValueError:
+                pass
+            else:
+                raise ValueError("Error not raised as expected!")
+
+def test_bitmap_without_numpy():
+    # Forces the pure Python fallback, which is otherwise untested when numpy is installed
+    global numpy
+    installed_numpy = numpy
+    numpy = None
+    try:
+        test_array_list()
+    finally:
+        numpy = installed_numpy
+
+def benchmark_set_operations(sizes : tuple = (1000, 10000, 100000, 1000000)):
+    # Time per element should stay constant if union and intersection scale linearly
+    for size in sizes:
+        linked_list_1 = LinkedList()
+        linked_list_2 = LinkedList()
+        for i in range(size):
+            linked_list_1.append(i)
+            linked_list_2.append(i + size // 2)
+
+        start = time.perf_counter()
+        union(linked_list_1, linked_list_2)
+        union_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        intersection(linked_list_1, linked_list_2)
+        intersec_time = time.perf_counter() - start
+
+        print("{:>8} elements: union {:>8.3f}s ({:.0f} ns/element), intersection {:>8.3f}s ({:.0f} ns/element)".format(
+            size, union_time, union_time / size * 1e9, intersec_time, intersec_time / size * 1e9))
+
+def benchmark_sorted_operations(size : int = 1000000, small_sizes : tuple = (10, 1000, 100000)):
+    # Compares set based operations against merging and galloping on sorted lists
+    linked_list_1 = LinkedList()
+    linked_list_2 = LinkedList()
+    for i in range(size):
+        linked_list_1.append(2 * i)
+        linked_list_2.append(3 * i)
+
+    # Sortedness is declared, so sorted operations skip the check
+    for name, function in [("union", union),
+                           ("sorted_union", lambda l1, l2: sorted_union(l1, l2, check_sorted=False)),
+                           ("intersection", intersection),
+                           ("sorted_intersection", lambda l1, l2: sorted_intersection(l1, l2, check_sorted=False))]:
+        start = time.perf_counter()
+        function(linked_list_1, linked_list_2)
+        print("{:>8} x {:>8} elements: {:<22} {:>8.3f}s".format(size, size, name, time.perf_counter() - start))
+
+    for small_size in small_sizes:
+        small_list = LinkedList()
+        for i in range(small_size):
+            small_list.append(i * (size // small_size))
+
+        for name, function in [("intersection", intersection),
+                               ("galloping_intersection", lambda l1, l2: galloping_intersection(l1, l2, check_sorted=False))]:
+            start = time.perf_counter()
+            function(small_list, linked_list_2)
+            print("{:>8} x {:>8} elements: {:<22} {:>8.3f}s".format(small_size, size, name, time.perf_counter() - start))
+
+def benchmark_streaming(size : int = 100000, sources : int = 20):
+    # Compares building LinkedLists and chaining intersection() against intersect_all().
+    # Inputs shrink from size down to size / sources elements, largest first, and every other
+    # input is a list, so intersect_all() can start from the smallest sized one
+    def source(index : int):
+        # Multiples of 1, 2 or 3
+        step = index % 3 + 1
+        values = (i for i in range(0, size // (index + 1) * step, step))
+        return list(values) if index % 2 == 1 else values
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    llists = []
+    for index in range(sources):
+        llist = LinkedList()
+        for i in source(index):
+            llist.append(i)
+        llists.append(llist)
+    result = llists[0]
+    for llist in llists[1:]:
+        result = intersection(result, llist)
+    first_result_time = total_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:>2} sources x {:>8} elements: LinkedLists    first {:>8.3f}s, total {:>8.3f}s, peak {:>10} bytes".format(
+        sources, size, first_result_time, total_time, peak))
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    results = intersect_all(*[source(index) for index in range(sources)])
+    next(results)
+    first_result_time = time.perf_counter() - start
+    for _ in results:
+        pass
+    total_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:>2} sources x {:>8} elements: intersect_all  first {:>8.3f}s, total {:>8.3f}s, peak {:>10} bytes".format(
+        sources, size, first_result_time, total_time, peak))
+
+def benchmark_array_list(size : int = 1000000):
+    # Compares bytes per element of both lists and set based against bitmap operations
+    values_1 = range(size)
+    values_2 = range(size // 2, size + size // 2)
+
+    for list_class in [LinkedList, ArrayLinkedList]:
+        tracemalloc.start()
+        llist_1 = list_class()
+        for i in values_1:
+            llist_1.append(i)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        llist_2 = list_class()
+        for i in values_2:
+            llist_2.append(i)
+
+        print("{:>8} elements: {:<16} {:>6.1f} bytes/element".format(size, list_class.__name__, memory / size))
+
+        timings = []
+        for name, function in [("union", union), ("bitmap_union", bitmap_union),
+                               ("intersection", intersection), ("bitmap_intersection", bitmap_intersection)]:
+            start = time.perf_counter()
+            function(llist_1, llist_2)
+            timings.append((name, time.perf_counter() - start))
+
+        for (name, elapsed), (bitmap_name, bitmap_elapsed) in [timings[0:2], timings[2:4]]:
+            print("{:>8} elements: {:<16} {:<12} {:>8.3f}s, {:<19} {:>8.3f}s ({:.1f}x, numpy: {})".format(
+                size, list_class.__name__, name, elapsed, bitmap_name, bitmap_elapsed, elapsed / bitmap_elapsed, numpy is not None))
+
 if __name__ == "__main__":
     test_edge_cases()
 
+    test_ordering()
+
+    test_sorted_lists()
+
+    test_streaming()
+
+    test_array_list()
+
+    test_bitmap_without_numpy()
+
     element_1 = [3,2,4,35,6,65,6,4,3,21]
     element_2 = [6,32,4,9,6,1,11,21,1]
     test_standard_lists(element_1, element_2)
@@ -176,4 +908,10 @@ if __name__ == "__main__":
     element_6 = []
     test_standard_lists(element_5, element_6)
 
+    if "--benchmark" in sys.argv:
+        benchmark_set_operations()
+        benchmark_sorted_operations()
+        benchmark_streaming()
+        benchmark_array_list()
+
 
@@ -0,0 +1,323 @@
+""" Opt-in instrumentation for the problem modules.
+
+    Hot paths check the module level `enabled` flag before doing any work,
+    so the overhead when tracing is disabled is a single attribute lookup.
+    Coarse phases may call span() directly, which costs a function call and
+    a shared no-op context manager when disabled. Counters track how often
+    hot operations run, and spans measure how long coarser phases take.
+    Spans can be exported as a Chrome trace (chrome://tracing or
+    https://ui.perfetto.dev) and aggregated stats can be reported periodically.
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+enabled = False
+
+_record_events = True
+_max_events = 100000
+
+_origin_ns = time.perf_counter_ns()
+_counters = {}      # name -> count
+_span_stats = {}    # name -> [count, total_ns, max_ns]
+_events = []        # Chrome trace events of finished spans
+
+
+def enable(record_events : bool = True, max_events : int = 100000):
+    """ Turns instrumentation on.
+
+    Keyword Arguments:
+        record_events {bool} -- Keep every span for export_chrome_trace(). Stats are always aggregated (default: {True})
+        max_events {int} -- Maximum number of spans kept. Later spans are only aggregated (default: {100000})
+    """
+    global enabled, _record_events, _max_events
+    _record_events = record_events
+    _max_events = max_events
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    """ Clears every counter, span statistic and recorded event.
+    """
+    global _origin_ns
+    _origin_ns = time.perf_counter_ns()
+    _counters.clear()
+    _span_stats.clear()
+    _events.clear()
+
+
+def count(name : str, value : int = 1):
+    """ Adds value to a counter. Callers should check `enabled` first.
+    """
+    _counters[name] = _counters.get(name, 0) + value
+
+
+class _Span:
+    __slots__ = ("_name", "_start_ns")
+
+    def __init__(self, name : str):
+        self._name = name
+
+    def __enter__(self):
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *args):
+        end_ns = time.perf_counter_ns()
+        duration_ns = end_ns - self._start_ns
+
+        stats = _span_stats.get(self._name)
+        if stats is None:
+            _span_stats[self._name] = [1, duration_ns, duration_ns]
+        else:
+            stats[0] += 1
+            stats[1] += duration_ns
+            if duration_ns > stats[2]:
+                stats[2] = duration_ns
+
+        if _record_events and len(_events) < _max_events:
+            _events.append({
+                "name": self._name,
+                "ph": "X",
+                "ts": (self._start_ns - _origin_ns) / 1000,
+                "dur": duration_ns / 1000,
+                "pid": os.getpid(),
+                "tid": threading.get_ident(),
+            })
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name : str):
+    """ Context manager timing the enclosed block. Does nothing when tracing is disabled.
+
+    Arguments:
+        name {str} -- Name of the span
+
+    Returns:
+        Context manager
+    """
+    if enabled:
+        return _Span(name)
+    return _NULL_SPAN
+
+
+def traced(name : str):
+    """ Decorator timing every call of a function as a span.
+
+    Arguments:
+        name {str} -- Name of the span
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with _Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    """ Returns aggregated counters and span statistics.
+
+    Returns:
+        dict -- {"counters": {name: count}, "spans": {name: {"count", "total_ms", "mean_ms", "max_ms"}}}
+    """
+    spans = {}
+    # Iterates over a copy, since other threads may add spans while a StatsReporter runs
+    for name, (span_count, total_ns, max_ns) in list(_span_stats.items()):
+        spans[name] = {
+            "count": span_count,
+            "total_ms": total_ns / 1e6,
+            "mean_ms": total_ns / span_count / 1e6,
+            "max_ms": max_ns / 1e6,
+        }
+    return {"counters": dict(_counters), "spans": spans}
+
+
+def export_chrome_trace(path : str):
+    """ Writes recorded spans, and the current value of every counter, in Chrome trace format.
+
+    Arguments:
+        path {str} -- Path of the JSON file
+    """
+    now_us = (time.perf_counter_ns() - _origin_ns) / 1000
+    counter_events = [{"name": name, "ph": "C", "ts": now_us, "pid": os.getpid(), "args": {name: value}}
+                      for name, value in _counters.items()]
+
+    with open(path, "w") as f:
+        json.dump({"traceEvents": list(_events) + counter_events, "displayTimeUnit": "ms"}, f)
+
+
+class StatsReporter:
+    """ Calls callback with stats() every interval seconds from a daemon thread.
+        By default stats are printed as JSON.
+    """
+    def __init__(self, interval : float, callback=None):
+        self._interval = interval
+        self._callback = callback or (lambda current_stats: print(json.dumps(current_stats)))
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> 'StatsReporter':
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the reporter after a final report.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop_event.wait(self._interval):
+            self._callback(stats())
+        self._callback(stats())
+
+
+def test_tracing():
+    import shutil
+    import sys
+    import tempfile
+
+    # Instrumented modules use the imported module, which differs from __main__ when run as a script
+    import tracing
+
+    from problem_1 import LRU_Cache
+    from problem_2 import find_files
+    from problem_3 import huffman_encoding, huffman_decoding
+    from problem_4 import Group, MembershipCache, is_user_in_group
+    from problem_5 import Block
+    from problem_6 import LinkedList, union
+
+    # Nothing is recorded while disabled
+    tracing.reset()
+    LRU_Cache(1).set(1, 1)
+    assert(tracing.stats() == {"counters": {}, "spans": {}})
+
+    directory = tempfile.mkdtemp()
+    tracing.enable()
+    try:
+        cache = LRU_Cache(1)
+        cache.set(1, 1)
+        cache.set(2, 2)
+        cache.get(1)
+        cache.get(2)
+
+        encoded_data, tree = huffman_encoding("The bird is the word")
+        huffman_decoding(encoded_data, tree)
+
+        parent = Group("parent")
+        child = Group("child")
+        parent.add_group(child)
+        is_user_in_group("orphan", parent)
+
+        Block("data", "0")
+
+        os.mkdir(os.path.join(directory, "subdir"))
+        find_files(".c", directory)
+
+        llist = LinkedList()
+        llist.append(1)
+        union(llist, llist)
+
+        with tracing.span("custom"):
+            pass
+    finally:
+        tracing.disable()
+        shutil.rmtree(directory)
+
+    current_stats = tracing.stats()
+    counters = current_stats["counters"]
+    assert(counters["lru_cache.set"] == 2)
+    assert(counters["lru_cache.evict"] == 1)
+    assert(counters["lru_cache.hit"] == 1)
+    assert(counters["lru_cache.miss"] == 1)
+    assert(counters["group.visit"] == 2)
+    assert(counters["block.calc_hash"] == 1)
+    assert(counters["find_files.directory"] == 2)
+    assert(current_stats["spans"]["find_files.listdir"]["count"] == 2)
+    for name in ["huffman.build_tree", "huffman.build_codes", "huffman.encode", "huffman.decode", "set.union", "custom"]:
+        assert(current_stats["spans"][name]["count"] == 1)
+
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "trace.json")
+        tracing.export_chrome_trace(path)
+        with open(path) as f:
+            events = json.load(f)["traceEvents"]
+    finally:
+        shutil.rmtree(directory)
+    assert(len([event for event in events if event["ph"] == "X"]) == 8)
+    assert({"lru_cache.set", "group.visit"} <= {event["name"] for event in events if event["ph"] == "C"})
+
+    reports = []
+    with tracing.StatsReporter(0.01, reports.append):
+        time.sleep(0.05)
+    assert(len(reports) >= 1)
+    assert(reports[-1] == current_stats)
+
+    # Reports keep coming while new span names appear. Frequent thread switches make them overlap
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    tracing.reset()
+    tracing.enable(record_events=False)
+    try:
+        with tracing.StatsReporter(0.0001, lambda current_stats: None) as reporter:
+            for index in range(20000):
+                with tracing.span("span{}".format(index)):
+                    pass
+            assert(reporter._thread.is_alive())
+    finally:
+        tracing.disable()
+        sys.setswitchinterval(switch_interval)
+    assert(len(tracing.stats()["spans"]) == 20000)
+
+    # Groups are visited by the cached lookup only on cache misses
+    tracing.reset()
+    tracing.enable()
+    try:
+        cache = MembershipCache(10)
+        cache.is_user_in_group("orphan", parent)
+        cache.is_user_in_group("orphan", parent)
+    finally:
+        tracing.disable()
+    assert(tracing.stats()["counters"]["group.visit"] == 2)
+
+    tracing.reset()
+    assert(tracing.stats() == {"counters": {}, "spans": {}})
+
+
+if __name__ == "__main__":
+
+    test_tracing()